@@ -61,6 +61,8 @@ export const pipelineActivities = pgTable('pipeline_activities', {
   streamIdIdx: index('pipeline_activities_stream_id_idx').on(table.streamId),
   signalIdIdx: index('pipeline_activities_signal_id_idx').on(table.signalId),
   createdAtIdx: index('pipeline_activities_created_at_idx').on(table.createdAt),
+  // Used by the cleanup_old_runs task's DELETE on (activity_type, started_at)
+  typeStartedAtIdx: index('pipeline_activities_activity_type_started_at_idx').on(table.activityType, table.startedAt),
 
 }));
 
@@ -4,9 +4,10 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
+from operator import attrgetter
 
 
-@dataclass
+@dataclass(slots=True)
 class Transition:
     """Represents a state transition in a signal."""
     start_time: datetime
@@ -128,7 +129,7 @@ class BaseTransitionDetector(ABC):
             return []
         
         # Sort by start time
-        sorted_transitions = sorted(transitions, key=lambda t: t.start_time)
+        sorted_transitions = sorted(transitions, key=attrgetter('start_time'))
         merged = [sorted_transitions[0]]
         
         for current in sorted_transitions[1:]:
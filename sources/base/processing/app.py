@@ -7,6 +7,7 @@ from datetime import datetime, date, timedelta, timezone
 from typing import Optional, List, Dict, Any
 from uuid import UUID, uuid4
 import json
+from operator import itemgetter
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -34,7 +35,7 @@ def merge_correlated_transitions(transitions, window_seconds=30):
         return transitions
     
     # Sort by timestamp
-    sorted_transitions = sorted(transitions, key=lambda t: t['transition_time'])
+    sorted_transitions = sorted(transitions, key=itemgetter('transition_time'))
     
     merged = []
     current_group = [sorted_transitions[0]]
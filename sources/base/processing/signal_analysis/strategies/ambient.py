@@ -10,7 +10,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from uuid import UUID
 import logging
-import numpy as np
+import math
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
@@ -20,6 +20,18 @@ from sources.base.generated_models.signals import Signals
 logger = logging.getLogger(__name__)
 
 
+def _mean_std(values: List[float]) -> tuple:
+    """Population mean and std of a short list in one pass, without NumPy."""
+    n = len(values)
+    total = 0.0
+    total_sq = 0.0
+    for v in values:
+        total += v
+        total_sq += v * v
+    mean = total / n
+    return mean, math.sqrt(max(total_sq / n - mean * mean, 0.0))
+
+
 class AmbientBoundaryDetector:
     """
     Detects boundaries from ambient signals using statistical change detection
@@ -198,8 +210,7 @@ class AmbientBoundaryDetector:
             if len(values) < window_size // 2:
                 continue
                 
-            mean_hr = np.mean(values)
-            std_hr = np.std(values)
+            mean_hr, std_hr = _mean_std(values)
             
             # Check if current value is significantly different
             if signals[i].value is not None:
@@ -260,6 +271,6 @@ class AmbientBoundaryDetector:
         # Rough approximation: 1 degree latitude = 111km
         # 1 degree longitude varies by latitude, using 111km * cos(latitude)
         lat_meters = lat_diff * 111000
-        lon_meters = lon_diff * 111000 * np.cos(np.radians(loc1[0]))
+        lon_meters = lon_diff * 111000 * math.cos(math.radians(loc1[0]))
         
-        return np.sqrt(lat_meters**2 + lon_meters**2)
\ No newline at end of file
+        return math.hypot(lat_meters, lon_meters)
\ No newline at end of file
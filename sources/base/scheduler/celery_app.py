@@ -33,6 +33,7 @@ app.conf.update(
     task_time_limit=300,  # 5 minutes
     task_soft_time_limit=240,  # 4 minutes (warning before hard timeout)
     worker_prefetch_multiplier=1,
+    task_acks_late=True,  # Re-queue long-running syncs if a worker dies mid-task
     worker_max_tasks_per_child=1000,
     task_routes={
         'process_ingested_data': {'queue': 'priority'},
@@ -2,17 +2,24 @@
 
 import json
 import logging
-from datetime import datetime, timedelta
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
+from celery import group
 from sqlalchemy import text
-from croniter import croniter
 
 from sources.base.scheduler.celery_app import app
 from sources.base.storage.database import SyncSessionLocal as Session
 
 logger = logging.getLogger(__name__)
 
+# Number of due streams each dispatch_stream_shard task enqueues
+DISPATCH_SHARD_SIZE = 100
+
+# Rows removed per DELETE transaction in cleanup_old_runs
+CLEANUP_BATCH_SIZE = 10000
+
 
 @app.task(name="check_scheduled_syncs")
 def check_scheduled_syncs():
@@ -52,6 +59,17 @@ def check_scheduled_syncs():
             """)
         ).fetchall()
 
+        # Prefetch connected sources once instead of querying per stream
+        active_sources = db.execute(
+            text("""
+                SELECT source_name, bool_or(oauth_access_token IS NOT NULL) as has_token
+                FROM sources
+                WHERE status = 'active'
+                GROUP BY source_name
+            """)
+        ).fetchall()
+        has_token_by_source = {row.source_name: row.has_token for row in active_sources}
+
         triggered = []
         now = datetime.utcnow()
 
@@ -59,39 +77,32 @@ def check_scheduled_syncs():
             stream = dict(row._mapping)
 
             # Check if there's a connected source for this stream
-            source_result = db.execute(
-                text("""
-                    SELECT id, status, oauth_access_token IS NOT NULL as has_token
-                    FROM sources
-                    WHERE source_name = :source_name
-                    AND status = 'active'
-                    LIMIT 1
-                """),
-                {"source_name": stream['source_name']}
-            ).first()
-
-            if not source_result:
+            if stream['source_name'] not in has_token_by_source:
                 logger.info(
                     f"No active source found for stream {stream['stream_name']}")
                 continue
 
-            if stream.get('auth_type') == 'oauth2' and not source_result.has_token:
+            if stream.get('auth_type') == 'oauth2' and not has_token_by_source[stream['source_name']]:
                 logger.info(
                     f"OAuth source {stream['source_name']} not authenticated")
                 continue
 
             # Check if sync is due based on cron schedule
             if should_sync(stream, now):
-                # Import sync_stream from sync_sources to avoid circular import
-                from .sync_sources import sync_stream
-                # Trigger sync for this stream
-                sync_stream.delay(str(stream['id']))
                 triggered.append({
                     "stream_id": str(stream['id']),
                     "stream_name": stream['stream_name'],
                     "source": stream['source_name']
                 })
 
+        # Fan out enqueueing of due streams across shard tasks
+        if triggered:
+            due_ids = [t['stream_id'] for t in triggered]
+            group(
+                dispatch_stream_shard.s(due_ids[i:i + DISPATCH_SHARD_SIZE])
+                for i in range(0, len(due_ids), DISPATCH_SHARD_SIZE)
+            ).apply_async()
+
         # Update pipeline activity with results
         db.execute(
             text("""
@@ -147,6 +158,37 @@ def check_scheduled_syncs():
         db.close()
 
 
+@app.task(name="dispatch_stream_shard")
+def dispatch_stream_shard(stream_ids: list):
+    """Enqueue sync_stream for a shard of due streams."""
+    # Import sync_stream from sync_sources to avoid circular import
+    from .sync_sources import sync_stream
+
+    # Publish the whole shard over one pooled producer/channel rather than
+    # acquiring a broker connection per delay() call
+    with app.producer_or_acquire() as producer:
+        for stream_id in stream_ids:
+            sync_stream.apply_async((stream_id,), producer=producer)
+
+    return {"dispatched": len(stream_ids)}
+
+
+@lru_cache(maxsize=4096)
+def _next_run(cron_schedule: str, last_sync: datetime, utc_offset: timedelta) -> datetime:
+    """
+    Next scheduled run after last_sync, cached per (expression, last sync).
+
+    A stream keeps the same last_ingestion_at on every scheduler tick until
+    it syncs, so repeat checks skip parsing. Each miss builds its own
+    croniter, and only the immutable result is shared. utc_offset is part
+    of the key because aware datetimes hash by instant, while croniter
+    evaluates the expression in last_sync's own zone.
+    """
+    # Imported here so croniter only loads once a schedule is actually checked
+    from croniter import croniter
+    return croniter(cron_schedule, last_sync).get_next(datetime)
+
+
 def should_sync(stream: dict, now: datetime) -> bool:
     """Check if a stream should sync based on its schedule."""
     cron_schedule = stream.get('cron_schedule')
@@ -164,16 +206,12 @@ def should_sync(stream: dict, now: datetime) -> bool:
         # Ensure both datetimes are timezone-aware or both are naive
         if last_sync.tzinfo is None:
             # If last_sync is naive, assume it's UTC
-            from datetime import timezone
             last_sync = last_sync.replace(tzinfo=timezone.utc)
         if now.tzinfo is None:
             # If now is naive, assume it's UTC
-            from datetime import timezone
             now = now.replace(tzinfo=timezone.utc)
 
-        cron = croniter(cron_schedule, last_sync)
-        next_run = cron.get_next(datetime)
-        return next_run <= now
+        return _next_run(cron_schedule, last_sync, last_sync.utcoffset()) <= now
     except Exception as e:
         logger.error(
             f"Invalid cron expression '{cron_schedule}' for stream {stream.get('stream_name')}: {e}")
@@ -182,29 +220,48 @@ def should_sync(stream: dict, now: datetime) -> bool:
 
 @app.task(name="cleanup_old_runs")
 def cleanup_old_runs(days_to_keep: int = 30):
-    """Clean up old ingestion runs to prevent table bloat."""
+    """Clean up old ingestion runs to prevent table bloat.
+
+    Batches are selected through pipeline_activities_activity_type_started_at_idx
+    (defined in apps/web/src/lib/db/schema/pipeline_activities.ts), so only the
+    row count is read back, never the deleted rows.
+    """
 
     db = Session()
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
+        # Aware UTC so the bind compares natively against timestamptz
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
 
-        # Delete old runs
-        result = db.execute(
-            text("""
-                DELETE FROM pipeline_activities 
-                WHERE activity_type = 'ingestion' 
-                AND started_at < :cutoff_date
-                RETURNING id
-            """),
-            {"cutoff_date": cutoff_date}
-        )
+        # Delete old runs in bounded batches, one short transaction each, so
+        # row locks are released between batches and concurrent writers
+        # aren't blocked behind one huge DELETE
+        deleted_count = 0
+        while True:
+            # Losing the last few batches on a crash is harmless here; they
+            # are simply deleted again on the next run
+            db.execute(text("SET LOCAL synchronous_commit = OFF"))
+            result = db.execute(
+                text("""
+                    DELETE FROM pipeline_activities
+                    WHERE ctid = ANY (ARRAY(
+                        SELECT ctid FROM pipeline_activities
+                        WHERE activity_type = 'ingestion'
+                        AND started_at < :cutoff_date
+                        LIMIT :batch_size
+                        FOR UPDATE SKIP LOCKED
+                    ))
+                """),
+                {"cutoff_date": cutoff_date, "batch_size": CLEANUP_BATCH_SIZE}
+            )
+            db.commit()
 
-        deleted_count = result.rowcount
-        db.commit()
+            deleted_count += result.rowcount
+            if result.rowcount < CLEANUP_BATCH_SIZE:
+                break
 
         return {
             "deleted": deleted_count,
             "cutoff_date": cutoff_date.isoformat()
         }
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -1,6 +1,7 @@
 """Celery tasks for processing stream batches from MinIO."""
 
 import os
+import gzip
 import json
 import traceback
 import importlib
@@ -44,6 +45,9 @@ async def get_stream_data(stream_key: str) -> Dict[str, Any]:
     ) as s3:
         response = await s3.get_object(Bucket=MINIO_BUCKET, Key=stream_key)
         data = await response['Body'].read()
+        # store_raw_data gzips payloads; older objects are plain JSON
+        if data[:2] == b'\x1f\x8b':
+            data = gzip.decompress(data)
         return json.loads(data.decode('utf-8'))
 
 
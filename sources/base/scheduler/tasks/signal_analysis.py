@@ -4,6 +4,8 @@ from celery.schedules import crontab
 import traceback
 import json
 import importlib
+import logging
+from functools import lru_cache
 from datetime import datetime, timedelta, time, timezone
 from typing import Dict, Any, List, Optional
 from uuid import uuid4
@@ -16,9 +18,29 @@ from sqlalchemy.orm import sessionmaker
 from sources.base.scheduler.celery_app import app
 from sources.base.storage.database import get_sync_db, sync_engine
 
+logger = logging.getLogger(__name__)
+
 # Create session factory using the centralized engine
 Session = sessionmaker(bind=sync_engine)
 
+_EPOCH = datetime(1970, 1, 1)
+
+# Below this many transitions generate_events_hdbscan skips clustering
+MIN_TRANSITIONS_FOR_CLUSTERING = 8
+
+
+def _to_naive(dt: datetime) -> datetime:
+    """Strip tzinfo from a datetime."""
+    # Not cached: aware datetimes hash by instant, so the same instant at
+    # another offset would get the first one's wall-clock value back
+    return dt.replace(tzinfo=None) if dt.tzinfo is not None else dt
+
+
+@lru_cache(maxsize=4096)
+def _epoch(dt_naive: datetime) -> float:
+    """Seconds since the Unix epoch for a naive UTC datetime."""
+    return (dt_naive - _EPOCH).total_seconds()
+
 
 @app.task(name="start_transition_detection", bind=True,
           autoretry_for=(Exception,), retry_kwargs={'max_retries': 3})
@@ -652,7 +674,7 @@ def generate_events_hdbscan(
                 import os
                 timezone = os.environ.get('DEFAULT_TIMEZONE', 'America/Chicago')
         
-        print(f"Using timezone: {timezone} for date: {date}")
+        logger.debug("Using timezone %s for date %s", timezone, date)
         
         # Parse date and create timezone-aware boundaries
         target_date = datetime.fromisoformat(date).date()
@@ -661,7 +683,7 @@ def generate_events_hdbscan(
         try:
             tz = pytz.timezone(timezone)
         except pytz.exceptions.UnknownTimeZoneError:
-            print(f"Unknown timezone {timezone}, falling back to America/Chicago")
+            logger.warning("Unknown timezone %s, falling back to America/Chicago", timezone)
             tz = pytz.timezone('America/Chicago')
         
         # Create midnight-to-midnight in user's timezone
@@ -672,9 +694,8 @@ def generate_events_hdbscan(
         utc_start = local_start.astimezone(pytz.UTC).replace(tzinfo=None)
         utc_end = local_end.astimezone(pytz.UTC).replace(tzinfo=None)
         
-        print(f"Date boundaries for {date} in {timezone}:")
-        print(f"  Local: {local_start} to {local_end}")
-        print(f"  UTC: {utc_start} to {utc_end}")
+        logger.debug("Date boundaries for %s in %s: local %s to %s, UTC %s to %s",
+                     date, timezone, local_start, local_end, utc_start, utc_end)
 
         # Get all transitions for the timezone-aware day
         result = db.execute(
@@ -701,139 +722,136 @@ def generate_events_hdbscan(
                 "error": f"Not enough transitions ({n_transitions}) for clustering. Need at least 2."
             }
         
-        # Phase 1: Extract features for HDBSCAN consolidation
-        print(f"Preparing {n_transitions} transitions for HDBSCAN consolidation...")
-        
-        # Build feature matrix for transition clustering
-        features = []
-        for i, t in enumerate(transitions):
-            trans_time = t['transition_time']
-            # Ensure timezone-naive for all calculations
-            if trans_time.tzinfo is not None:
-                trans_time = trans_time.replace(tzinfo=None)
+        # Structure-of-arrays view of the transitions (rows are already
+        # ordered by transition_time); the phases below index these by
+        # position instead of doing per-row dict lookups
+        trans_times = [_to_naive(t['transition_time']) for t in transitions]
+        trans_ts = np.array(trans_times, dtype='datetime64[us]')
+        trans_epoch = np.array([_epoch(tt) for tt in trans_times], dtype=np.float64)
+        trans_conf = np.array([t.get('confidence', 0.5) for t in transitions], dtype=np.float64)
+        trans_ids = [t['id'] for t in transitions]
+        trans_signals = [t['signal_name'] for t in transitions]
+        trans_sources = [t['source_name'] for t in transitions]
+
+        if n_transitions <= MIN_TRANSITIONS_FOR_CLUSTERING:
+            # Too few transitions for DBSCAN consolidation to pay off; skip
+            # feature extraction and clustering and keep each transition
+            # as its own boundary (Phase 4 still reduces to the target)
+            logger.debug("Only %d transitions, skipping HDBSCAN consolidation", n_transitions)
+            cluster_labels = np.full(n_transitions, -1)
+        else:
+            # Phase 1: Extract features for HDBSCAN consolidation
+            logger.debug("Preparing %d transitions for HDBSCAN consolidation", n_transitions)
+
+            # Local windows (transitions within 2 minutes) as index ranges
+            window = np.timedelta64(2, 'm')
+            window_lo = np.searchsorted(trans_ts, trans_ts - window, side='left')
+            window_hi = np.searchsorted(trans_ts, trans_ts + window, side='right')
+
+            # Build feature matrix for transition clustering
+            features = []
+            for i, t in enumerate(transitions):
+                trans_time = trans_times[i]
             
-            # Feature 1: Temporal position (most important for consolidation)
-            time_of_day = trans_time.hour + trans_time.minute / 60.0  # 0-24 scale
+                # Feature 1: Temporal position (most important for consolidation)
+                time_of_day = trans_time.hour + trans_time.minute / 60.0  # 0-24 scale
             
-            # Feature 2: Signal type embedding (simple hash for now)
-            signal_hash = hash(t['signal_name']) % 100 / 100.0  # 0-1 scale
+                # Feature 2: Signal type embedding (simple hash for now)
+                signal_hash = hash(trans_signals[i]) % 100 / 100.0  # 0-1 scale
             
-            # Feature 3: Change magnitude
-            magnitude = t.get('change_magnitude', 0.5) if t.get('change_magnitude') else 0.5
+                # Feature 3: Change magnitude
+                magnitude = t.get('change_magnitude', 0.5) if t.get('change_magnitude') else 0.5
             
-            # Feature 4: Confidence
-            confidence = t.get('confidence', 0.5)
+                # Feature 4: Confidence
+                confidence = trans_conf[i]
             
-            # Feature 5: Local density (transitions within 2 minutes)
-            window_start = trans_time - timedelta(minutes=2)
-            window_end = trans_time + timedelta(minutes=2)
-            nearby_count = 0
-            for other in transitions:
-                other_time = other['transition_time']
-                # Ensure consistent timezone handling
-                if other_time.tzinfo is not None:
-                    other_time = other_time.replace(tzinfo=None)
-                if window_start <= other_time <= window_end:
-                    nearby_count += 1
-            density = nearby_count / 10.0  # Normalize to ~0-1
+                # Feature 5: Local density (transitions within 2 minutes)
+                lo, hi = window_lo[i], window_hi[i]
+                density = (hi - lo) / 10.0  # Normalize to ~0-1
             
-            # Feature 6: Source diversity in local window
-            nearby_sources = set()
-            for other in transitions:
-                other_time = other['transition_time']
-                # Ensure consistent timezone handling
-                if other_time.tzinfo is not None:
-                    other_time = other_time.replace(tzinfo=None)
-                if window_start <= other_time <= window_end:
-                    nearby_sources.add(other['source_name'])
-            diversity = len(nearby_sources) / 4.0  # Normalize by max sources
+                # Feature 6: Source diversity in local window
+                diversity = len(set(trans_sources[lo:hi])) / 4.0  # Normalize by max sources
             
-            features.append([
-                time_of_day,    # When
-                signal_hash,    # What signal
-                magnitude,      # How much change
-                confidence,     # How confident
-                density,        # How many nearby
-                diversity       # How diverse
-            ])
+                features.append([
+                    time_of_day,    # When
+                    signal_hash,    # What signal
+                    magnitude,      # How much change
+                    confidence,     # How confident
+                    density,        # How many nearby
+                    diversity       # How diverse
+                ])
         
-        features = np.array(features)
-        print(f"Feature matrix shape: {features.shape}")
+            features = np.array(features)
 
-        # Phase 2: HDBSCAN clustering to consolidate transitions
-        print(f"Running HDBSCAN to consolidate transitions into boundaries...")
+            # Phase 2: HDBSCAN clustering to consolidate transitions
+            logger.debug("Running HDBSCAN on feature matrix of shape %s", features.shape)
         
-        # Use DBSCAN for consolidation (HDBSCAN not available, but DBSCAN works well)
-        # Key parameters:
-        # - eps: controls how close transitions need to be to consolidate
-        # - min_samples: minimum transitions to form a consolidated boundary
-        from sklearn.cluster import DBSCAN
+            # Use DBSCAN for consolidation (HDBSCAN not available, but DBSCAN works well)
+            # Key parameters:
+            # - eps: controls how close transitions need to be to consolidate
+            # - min_samples: minimum transitions to form a consolidated boundary
+            from sklearn.cluster import DBSCAN
         
-        clusterer = DBSCAN(
-            eps=0.3,  # Relatively tight clustering for consolidation
-            min_samples=2,  # At least 2 transitions to consolidate
-            metric='euclidean'
-        )
-        
-        cluster_labels = clusterer.fit_predict(features)
-        n_clusters = len(set(cluster_labels)) - (1 if -1 in cluster_labels else 0)
-        n_noise = list(cluster_labels).count(-1)
+            clusterer = DBSCAN(
+                eps=0.3,  # Relatively tight clustering for consolidation
+                min_samples=2,  # At least 2 transitions to consolidate
+                metric='euclidean'
+            )
         
-        print(f"Found {n_clusters} clusters and {n_noise} noise points")
+            cluster_labels = clusterer.fit_predict(features)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            n_noise = int(np.count_nonzero(cluster_labels == -1))
+            n_clusters = len(set(cluster_labels)) - (1 if n_noise else 0)
+            logger.debug("Found %d clusters and %d noise points", n_clusters, n_noise)
         
         # Phase 3: Create consolidated boundaries from clusters
         boundaries = []
+        boundary_epoch = []
         
         for cluster_id in set(cluster_labels):
-            cluster_transitions = [transitions[i] for i, label in enumerate(cluster_labels) 
-                                  if label == cluster_id]
+            members = np.flatnonzero(cluster_labels == cluster_id)
             
             if cluster_id == -1:
                 # Noise points remain individual boundaries
-                for t in cluster_transitions:
-                    trans_time = t['transition_time']
-                    # Ensure timezone-naive for consistency
-                    if trans_time.tzinfo is not None:
-                        trans_time = trans_time.replace(tzinfo=None)
+                for i in members:
                     boundaries.append({
-                        'timestamp': trans_time,
-                        'confidence': t.get('confidence', 0.5),
+                        'timestamp': trans_times[i],
+                        'confidence': float(trans_conf[i]),
                         'transition_count': 1,
-                        'source_transitions': [t['id']],
+                        'source_transitions': [trans_ids[i]],
                         'is_consolidated': False
                     })
+                    boundary_epoch.append(trans_epoch[i])
             else:
                 # Consolidate cluster to single boundary
                 # Use confidence-weighted average for timestamp
-                weights = [t.get('confidence', 0.5) for t in cluster_transitions]
-                # Handle both timezone-aware and naive datetimes
-                timestamps = []
-                for t in cluster_transitions:
-                    trans_time = t['transition_time']
-                    if trans_time.tzinfo is not None:
-                        trans_time = trans_time.replace(tzinfo=None)
-                    timestamps.append((trans_time - datetime(1970, 1, 1)).total_seconds())
-                weighted_timestamp_seconds = np.average(timestamps, weights=weights)
-                weighted_timestamp = datetime(1970, 1, 1) + timedelta(seconds=weighted_timestamp_seconds)
+                weights = trans_conf[members]
+                weighted_timestamp_seconds = np.average(trans_epoch[members], weights=weights)
+                weighted_timestamp = _EPOCH + timedelta(seconds=weighted_timestamp_seconds)
                 
                 boundaries.append({
                     'timestamp': weighted_timestamp,
-                    'confidence': np.mean(weights),
-                    'transition_count': len(cluster_transitions),
-                    'source_transitions': [t['id'] for t in cluster_transitions],
+                    'confidence': float(np.mean(weights)),
+                    'transition_count': len(members),
+                    'source_transitions': [trans_ids[i] for i in members],
                     'is_consolidated': True
                 })
+                boundary_epoch.append(weighted_timestamp_seconds)
         
-        # Sort boundaries by time
-        boundaries.sort(key=lambda b: b['timestamp'])
-        print(f"Created {len(boundaries)} boundaries from {n_transitions} transitions")
+        # Order noise and consolidated boundaries by time with a single argsort
+        boundary_epoch = np.array(boundary_epoch, dtype=np.float64)
+        order = np.argsort(boundary_epoch, kind='stable')
+        boundaries = [boundaries[i] for i in order]
+        boundary_epoch = boundary_epoch[order]
+        logger.debug("Created %d boundaries from %d transitions", len(boundaries), n_transitions)
         
         # Phase 4: Reduce boundaries to target range (8-24)
         # Calculate target based on data coverage
         if boundaries:
-            first_boundary = boundaries[0]['timestamp']
-            last_boundary = boundaries[-1]['timestamp']
-            data_span_hours = (last_boundary - first_boundary).total_seconds() / 3600
+            span = np.array([boundaries[0]['timestamp'], boundaries[-1]['timestamp']],
+                            dtype='datetime64[ns]')
+            data_span_hours = float((span[1] - span[0]) / np.timedelta64(1, 'h'))
             
             # Scale target based on data coverage
             # For full day (24 hours): 8-24 events
@@ -854,33 +872,39 @@ def generate_events_hdbscan(
                 scaled_min = max(4, int(target_min_events * data_coverage_ratio))
                 scaled_max = max(scaled_min + 2, int(target_max_events * data_coverage_ratio))
             
-            print(f"Data spans {data_span_hours:.1f} hours, target: {scaled_min}-{scaled_max} segments")
+            logger.debug("Data spans %.1f hours, target: %d-%d segments", data_span_hours, scaled_min, scaled_max)
         else:
             scaled_min = target_min_events
             scaled_max = target_max_events
         
         # Reduce boundaries if needed
-        while len(boundaries) > scaled_max:
-            # Find least important adjacent pair
-            min_importance = float('inf')
-            merge_idx = -1
-            
-            for i in range(len(boundaries) - 1):
-                # Importance = confidence product * log(time gap)
-                time_gap = (boundaries[i+1]['timestamp'] - boundaries[i]['timestamp']).total_seconds()
-                importance = boundaries[i]['confidence'] * boundaries[i+1]['confidence'] * np.log(time_gap + 60)
-                
-                if importance < min_importance:
-                    min_importance = importance
-                    merge_idx = i
-            
-            # Merge by removing less confident boundary
-            if boundaries[merge_idx]['confidence'] < boundaries[merge_idx + 1]['confidence']:
-                boundaries.pop(merge_idx)
-            else:
-                boundaries.pop(merge_idx + 1)
-        
-        print(f"Reduced to {len(boundaries)} boundaries after targeting {scaled_min}-{scaled_max} segments")
+        if len(boundaries) > scaled_max:
+            # Work on arrays with a keep mask instead of list.pop(), which
+            # shifts the list on every merge
+            conf = np.array([b['confidence'] for b in boundaries], dtype=np.float64)
+            ts = boundary_epoch
+            keep = np.ones(len(boundaries), dtype=bool)
+            n_kept = len(boundaries)
+
+            while n_kept > scaled_max:
+                alive = np.flatnonzero(keep)
+
+                # Importance = confidence product * log(time gap);
+                # merge the least important adjacent pair
+                importance = conf[alive[:-1]] * conf[alive[1:]] * np.log(np.diff(ts[alive]) + 60)
+                merge_idx = int(np.argmin(importance))
+                left, right = alive[merge_idx], alive[merge_idx + 1]
+
+                # Merge by removing less confident boundary
+                if conf[left] < conf[right]:
+                    keep[left] = False
+                else:
+                    keep[right] = False
+                n_kept -= 1
+
+            boundaries = [b for b, k in zip(boundaries, keep) if k]
+
+        logger.debug("Reduced to %d boundaries after targeting %d-%d segments", len(boundaries), scaled_min, scaled_max)
 
         # Phase 5: Create continuous segments from boundaries
         # Use the timezone-aware boundaries we calculated earlier
@@ -905,7 +929,7 @@ def generate_events_hdbscan(
                     'source_transitions': [],
                     'is_synthetic': True
                 })
-                print(f"Added synthetic start boundary (gap: {gap_from_start/3600:.1f} hours)")
+                logger.debug("Added synthetic start boundary (gap: %.1f hours)", gap_from_start / 3600)
             
             # Add real boundaries
             all_boundaries.extend(boundaries)
@@ -921,11 +945,11 @@ def generate_events_hdbscan(
                     'source_transitions': [],
                     'is_synthetic': True
                 })
-                print(f"Added synthetic end boundary (gap: {gap_to_end/3600:.1f} hours)")
+                logger.debug("Added synthetic end boundary (gap: %.1f hours)", gap_to_end / 3600)
             elif gap_to_end >= 14400:
                 # Gap is too large - data ends early in the day
                 # Ensure the last boundary properly ends the segments
-                print(f"Data ends early (gap to day end: {gap_to_end/3600:.1f} hours)")
+                logger.debug("Data ends early (gap to day end: %.1f hours)", gap_to_end / 3600)
                 # The last real boundary is already in all_boundaries
                 # No need to add anything else
         else:
@@ -937,6 +961,10 @@ def generate_events_hdbscan(
                  'source_transitions': [], 'is_synthetic': True}
             ]
         
+        # Segment durations in one vectorized pass over the boundary times
+        all_boundaries_ts = np.array([b['timestamp'] for b in all_boundaries], dtype='datetime64[ns]')
+        durations_min = np.diff(all_boundaries_ts) / np.timedelta64(1, 'm')
+
         # Create segments between each pair of boundaries
         segments = []
         for i in range(len(all_boundaries) - 1):
@@ -948,21 +976,15 @@ def generate_events_hdbscan(
                 'exit_confidence': all_boundaries[i+1]['confidence'],
                 'entry_transition_count': all_boundaries[i]['transition_count'],
                 'exit_transition_count': all_boundaries[i+1]['transition_count'],
-                'is_edge_segment': i == 0 or i == len(all_boundaries) - 2
+                'is_edge_segment': i == 0 or i == len(all_boundaries) - 2,
+                'duration_minutes': float(durations_min[i])
             }
-            
-            # Calculate duration
-            duration_seconds = (segment['end_time'] - segment['start_time']).total_seconds()
-            segment['duration_minutes'] = duration_seconds / 60
-            
             segments.append(segment)
         
         # Don't add segments beyond actual data
         # When data ends early in the day (e.g., 4:38 AM), we should stop there
         # The frontend can handle partial days by showing "no data" for the rest
         
-        print(f"Created {len(segments)} segments")
-        
         # Clear existing events for this date
         db.execute(
             text("DELETE FROM events WHERE date = :target_date"),
@@ -977,38 +999,31 @@ def generate_events_hdbscan(
             if segment['is_edge_segment'] and segment['duration_minutes'] < 5:
                 continue
             
-            # Find transitions within this segment
-            segment_transitions = []
-            for t in transitions:
-                trans_time = t['transition_time']
-                # Ensure consistent timezone handling
-                if trans_time.tzinfo is not None:
-                    trans_time = trans_time.replace(tzinfo=None)
-                if segment['start_time'] <= trans_time < segment['end_time']:
-                    segment_transitions.append(t)
+            # Find transitions within this segment (half-open range over
+            # the time-ordered transition arrays)
+            seg_lo = np.searchsorted(trans_ts, np.datetime64(segment['start_time'], 'us'), side='left')
+            seg_hi = np.searchsorted(trans_ts, np.datetime64(segment['end_time'], 'us'), side='left')
+            segment_ids = trans_ids[seg_lo:seg_hi]
             
             # Calculate segment characteristics
-            if segment_transitions:
+            if segment_ids:
                 # Signal contributions
                 signal_counts = {}
-                for t in segment_transitions:
-                    sig_name = t['signal_name']
+                for sig_name in trans_signals[seg_lo:seg_hi]:
                     signal_counts[sig_name] = signal_counts.get(sig_name, 0) + 1
                 
                 # Source diversity
-                unique_sources = set(t['source_name'] for t in segment_transitions)
+                unique_sources = set(trans_sources[seg_lo:seg_hi])
                 
                 # Confidence statistics
-                confidences = [t['confidence'] for t in segment_transitions]
-                avg_confidence = np.mean(confidences) if confidences else 0.5
+                avg_confidence = float(np.mean(trans_conf[seg_lo:seg_hi]))
                 
                 # Activity intensity (transitions per minute)
-                activity_intensity = len(segment_transitions) / segment['duration_minutes'] if segment['duration_minutes'] > 0 else 0
+                activity_intensity = len(segment_ids) / segment['duration_minutes'] if segment['duration_minutes'] > 0 else 0
                 
                 # Dominant source
                 source_counts = {}
-                for t in segment_transitions:
-                    src = t['source_name']
+                for src in trans_sources[seg_lo:seg_hi]:
                     source_counts[src] = source_counts.get(src, 0) + 1
                 dominant_source = max(source_counts.items(), key=lambda x: x[1])[0] if source_counts else None
             else:
@@ -1040,9 +1055,9 @@ def generate_events_hdbscan(
                     "start_time": segment['start_time'],
                     "end_time": segment['end_time'],
                     "core_density": segment['entry_confidence'],  # Use entry boundary confidence
-                    "cluster_size": len(segment_transitions),
+                    "cluster_size": len(segment_ids),
                     "persistence": segment['duration_minutes'] / (24 * 60),  # Fraction of day
-                    "transition_ids": [t['id'] for t in segment_transitions],
+                    "transition_ids": segment_ids,
                     "signal_contributions": json.dumps(signal_counts),
                     "event_metadata": json.dumps({
                         "segment_type": "continuous",
@@ -1056,7 +1071,7 @@ def generate_events_hdbscan(
                         "avg_confidence": avg_confidence,
                         "unique_sources": list(unique_sources),
                         "dominant_source": dominant_source,
-                        "has_transitions": len(segment_transitions) > 0,
+                        "has_transitions": len(segment_ids) > 0,
                         "signal_distribution": signal_counts,
                         "timezone": timezone,
                         "local_date": date
@@ -1069,16 +1084,21 @@ def generate_events_hdbscan(
                 "start_time": segment['start_time'].isoformat(),
                 "end_time": segment['end_time'].isoformat(),
                 "duration_minutes": segment['duration_minutes'],
-                "transition_count": len(segment_transitions),
+                "transition_count": len(segment_ids),
                 "activity_intensity": activity_intensity,
                 "avg_confidence": avg_confidence
             })
         
-        print(f"Stored {len(events_created)} segments as events")
         db.commit()
         
         processing_time_ms = int(
             (datetime.utcnow() - start_process_time).total_seconds() * 1000)
+
+        logger.info(
+            "Generated events for %s: %d transitions, %d boundaries, %d segments, %d stored in %dms",
+            target_date, n_transitions, len(boundaries), len(segments),
+            len(events_created), processing_time_ms
+        )
         
         return {
             "success": True,
@@ -2,38 +2,171 @@
 
 import asyncio
 import os
-import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional
-import traceback
 import importlib
-from uuid import uuid4
 
+import orjson
 from celery import Task
+from celery.signals import worker_process_shutdown
 from sqlalchemy import text, select, update
 from sqlalchemy.orm import sessionmaker
 
 from sources.base.scheduler.celery_app import app
-from sources.base.storage.database import sync_engine, SyncSessionLocal as Session
+from sources.base.storage.database import sync_engine, AsyncSessionLocal
+from sources.base.storage.minio import close_default_client
 from .token_refresh import create_token_refresher
 
 
-def json_serializable(obj):
-    """Convert objects to JSON-serializable format."""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    elif isinstance(obj, dict):
-        return {k: json_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [json_serializable(v) for v in obj]
-    else:
-        return obj
+def dumps_stats(stats: Dict[str, Any]) -> str:
+    """Serialize sync stats to a JSON string, datetimes as ISO 8601."""
+    # orjson encodes datetimes natively in C; anything else falls back to str
+    return orjson.dumps(stats, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _finish_params(run_id, status: str, at: datetime) -> Dict[str, Any]:
+    """Bind params shared by the completed/failed pipeline_activities updates."""
+    return {"id": run_id, "status": status, "completed_at": at, "updated_at": at}
 
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# SQL statements used on every sync run, built once at import
+_SELECT_STREAM = text("""
+    SELECT stc.*, src.company, src.platform, src.auth_type,
+           s.id as stream_instance_id, s.initial_sync_type, s.initial_sync_days, s.initial_sync_days_future,
+           s.sync_schedule as instance_sync_schedule, s.settings as instance_settings, s.sync_cursor,
+           CASE
+               WHEN src.platform = 'device' THEN 'device_source'
+               WHEN stc.status IS DISTINCT FROM 'active' THEN 'stream_inactive'
+           END AS skip_reason
+    FROM stream_configs stc 
+    JOIN source_configs src ON stc.source_name = src.name
+    LEFT JOIN streams s ON s.stream_config_id = stc.id
+    WHERE stc.id = :stream_id
+""")
+
+_INSERT_STREAM_ACTIVITY = text("""
+    INSERT INTO pipeline_activities 
+    (id, activity_type, activity_name, source_name, stream_id, 
+     status, started_at, created_at, updated_at) 
+    VALUES (gen_random_uuid(), :activity_type, :activity_name, :source_name, 
+            :stream_id, :status, :started_at, :created_at, :updated_at)
+    RETURNING id
+""")
+
+_SELECT_STREAM_OAUTH_SOURCE = text("""
+    SELECT id, oauth_access_token, oauth_refresh_token, oauth_expires_at, scopes
+    FROM sources
+    WHERE source_name = :source_name
+    AND oauth_access_token IS NOT NULL
+    AND status = 'active'
+    LIMIT 1
+""")
+
+_UPDATE_STREAM_CURSOR = text("""
+    UPDATE streams 
+    SET sync_cursor = :sync_cursor,
+        last_sync_at = :last_sync_at,
+        last_sync_status = 'success',
+        updated_at = :updated_at
+    WHERE id = :id
+""")
+
+_COMPLETE_STREAM_ACTIVITY = text("""
+    WITH stream_update AS (
+        UPDATE stream_configs 
+        SET last_ingestion_at = :last_ingestion_at,
+            updated_at = :updated_at
+        WHERE id = :stream_id
+    )
+    UPDATE pipeline_activities 
+    SET status = :status,
+        completed_at = :completed_at,
+        records_processed = :records_processed,
+        updated_at = :updated_at,
+        activity_metadata = :activity_metadata
+    WHERE id = :id
+""")
+
+_FAIL_ACTIVITY = text("""
+    UPDATE pipeline_activities 
+    SET status = :status,
+        completed_at = :completed_at,
+        error_message = :error_message,
+        updated_at = :updated_at
+    WHERE id = :id
+""")
+
+_SELECT_SIGNAL = text("""
+    SELECT s.*, src.company, src.platform
+    FROM signals s 
+    JOIN sources src ON s.source_name = src.name
+    WHERE s.id = :signal_id
+""")
+
+_INSERT_SIGNAL_ACTIVITY = text("""
+    INSERT INTO pipeline_activities 
+    (id, activity_type, activity_name, source_name, signal_id, 
+     status, started_at, created_at, updated_at) 
+    VALUES (gen_random_uuid(), :activity_type, :activity_name, :source_name, 
+            :signal_id, :status, :started_at, :created_at, :updated_at)
+    RETURNING id
+""")
+
+_SELECT_SIGNAL_OAUTH_SOURCE = text("""
+    SELECT oauth_access_token, oauth_refresh_token, oauth_expires_at, scopes
+    FROM sources
+    WHERE source_name = :source_name
+    AND oauth_access_token IS NOT NULL
+    LIMIT 1
+""")
+
+_COMPLETE_SIGNAL_ACTIVITY = text("""
+    WITH signal_update AS (
+        UPDATE signals 
+        SET last_successful_ingestion_at = :last_successful_ingestion_at,
+            sync_token = :sync_token,
+            updated_at = :updated_at
+        WHERE id = :signal_id
+    )
+    UPDATE pipeline_activities 
+    SET status = :status,
+        completed_at = :completed_at,
+        records_processed = :records_processed,
+        updated_at = :updated_at,
+        activity_metadata = :activity_metadata
+    WHERE id = :id
+""")
+
+# Resolved sync classes keyed by (stream_name, source_name)
+_SYNC_CLASS_CACHE: Dict[tuple, type] = {}
+
+# Event loop reused by async sync implementations within a worker process
+_WORKER_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Get the worker's persistent event loop, creating it on first use."""
+    global _WORKER_LOOP
+    if _WORKER_LOOP is None or _WORKER_LOOP.is_closed():
+        _WORKER_LOOP = asyncio.new_event_loop()
+        asyncio.set_event_loop(_WORKER_LOOP)
+    return _WORKER_LOOP
+
+
+@worker_process_shutdown.connect
+def _close_worker_loop(**kwargs):
+    """Close the persistent event loop when the worker process exits."""
+    global _WORKER_LOOP
+    if _WORKER_LOOP is not None and not _WORKER_LOOP.is_closed():
+        # Release the shared S3 client's connector on the loop that owns it
+        _WORKER_LOOP.run_until_complete(close_default_client())
+        _WORKER_LOOP.close()
+    _WORKER_LOOP = None
+
 
 class SourceRegistry:
     """Registry for dynamically loading source sync classes."""
@@ -42,6 +175,11 @@ class SourceRegistry:
     def get_sync_class(stream_name: str, source_name: str):
         """Get sync class based on naming convention."""
         
+        cache_key = (stream_name, source_name)
+        cached = _SYNC_CLASS_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
         # Check if this is a push stream (no sync needed)
         # Push streams like ios_mic don't have sync classes
         push_streams = ['ios_mic', 'ios_location', 'ios_healthkit', 'mac_apps']
@@ -68,50 +206,46 @@ class SourceRegistry:
         # Import and return the class
         try:
             module = importlib.import_module(sync_module)
-            return getattr(module, sync_class)
+            resolved = getattr(module, sync_class)
         except ImportError as e:
             raise ValueError(f"Failed to import {sync_module}: {e}")
         except AttributeError as e:
             raise ValueError(f"Class {sync_class} not found in {sync_module}: {e}")
+        
+        _SYNC_CLASS_CACHE[cache_key] = resolved
+        return resolved
 
 
-@app.task(name="sync_stream", bind=True,
+@app.task(name="sync_stream", bind=True, acks_late=True,
           autoretry_for=(Exception,), retry_kwargs={'max_retries': 3})
 def sync_stream(self, stream_id: str, manual: bool = False):
     """Generic task to sync any data stream."""
+    return _get_loop().run_until_complete(_sync_stream(self, stream_id, manual))
+
 
-    # Use sync database session
-    db = Session()
-    try:
-        # Get stream details with instance configuration
-        result = db.execute(
-            text("""
-                SELECT stc.*, src.company, src.platform, src.auth_type,
-                       s.id as stream_instance_id, s.initial_sync_type, s.initial_sync_days, s.initial_sync_days_future,
-                       s.sync_schedule as instance_sync_schedule, s.settings as instance_settings, s.sync_cursor
-                FROM stream_configs stc 
-                JOIN source_configs src ON stc.source_name = src.name
-                LEFT JOIN streams s ON s.stream_config_id = stc.id
-                WHERE stc.id = :stream_id
-            """),
+async def _sync_stream(task, stream_id: str, manual: bool):
+    """Body of sync_stream, run on the worker loop over an AsyncSession."""
+
+    async with AsyncSessionLocal() as db:
+        # Get stream details with instance configuration. skip_reason is set
+        # for device sources (they push their own data) and inactive streams
+        result = (await db.execute(
+            _SELECT_STREAM,
             {"stream_id": stream_id}
-        ).first()
+        )).first()
 
         if not result:
             raise ValueError(f"Stream {stream_id} not found")
 
         stream = dict(result._mapping)
-        source_name = stream['source_name']
-        stream_name = stream['stream_name']
-        platform = stream.get('platform', 'cloud')
+        skip_reason = stream.pop('skip_reason', None)
 
-        # Skip device sources - they push their own data
-        if platform == 'device' and not manual:
-            return {"status": "skipped", "reason": "device_source"}
+        # Skip device sources and inactive streams unless manually triggered
+        if skip_reason and not manual:
+            return {"status": "skipped", "reason": skip_reason}
 
-        # Skip inactive streams unless manually triggered
-        if stream['status'] != 'active' and not manual:
-            return {"status": "skipped", "reason": "stream_inactive"}
+        source_name = stream['source_name']
+        stream_name = stream['stream_name']
 
         # Get the sync class for this stream (not source)
         try:
@@ -120,50 +254,39 @@ def sync_stream(self, stream_id: str, manual: bool = False):
             # Source doesn't have a sync implementation (might be webhook-only)
             return {"status": "skipped", "reason": str(e)}
 
-        # Create ingestion run
-        ingestion_run_id = uuid4()
-
-        db.execute(
-            text("""
-                INSERT INTO pipeline_activities 
-                (id, activity_type, activity_name, source_name, stream_id, 
-                 status, started_at, created_at, updated_at) 
-                VALUES (:id, :activity_type, :activity_name, :source_name, 
-                        :stream_id, :status, :started_at, :created_at, :updated_at)
-            """),
+        # Look up OAuth tokens in the same transaction as the run INSERT so
+        # no transaction is left open on the connection while the sync runs
+        source_result = None
+        if stream.get('auth_type') == 'oauth2':
+            source_result = (await db.execute(
+                _SELECT_STREAM_OAUTH_SOURCE,
+                {
+                    "source_name": source_name
+                }
+            )).first()
+
+        # Create ingestion run; Postgres generates the id
+        started_at = datetime.now(timezone.utc)
+
+        ingestion_run_id = (await db.execute(
+            _INSERT_STREAM_ACTIVITY,
             {
-                "id": str(ingestion_run_id),
                 "activity_type": "ingestion",
                 "activity_name": f"{source_name}_stream_ingestion",
                 "source_name": source_name,
                 "stream_id": stream_id,  # Include the stream_id
                 "status": "running",
-                "started_at": datetime.utcnow(),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "started_at": started_at,
+                "created_at": started_at,
+                "updated_at": started_at
             }
-        )
-        db.commit()
+        )).scalar_one()
+        await db.commit()
 
         try:
             # Check if source requires credentials
             oauth_credentials = None
             if stream.get('auth_type') == 'oauth2':
-                # Get OAuth tokens from the sources table
-                source_result = db.execute(
-                    text("""
-                        SELECT id, oauth_access_token, oauth_refresh_token, oauth_expires_at, scopes
-                        FROM sources
-                        WHERE source_name = :source_name
-                        AND oauth_access_token IS NOT NULL
-                        AND status = 'active'
-                        LIMIT 1
-                    """),
-                    {
-                        "source_name": source_name
-                    }
-                ).first()
-
                 if source_result:
                     oauth_credentials = dict(source_result._mapping)
                     oauth_credentials['source_id'] = oauth_credentials['id']
@@ -180,8 +303,9 @@ def sync_stream(self, stream_id: str, manual: bool = False):
                 sync = sync_class(
                     stream_obj,
                     oauth_credentials['oauth_access_token'],
+                    # The raw stream row carries auth_type; the wrapper has no .get
                     token_refresher=create_token_refresher(
-                        source_name, oauth_credentials, stream_obj, db) if oauth_credentials.get('oauth_refresh_token') else None
+                        source_name, oauth_credentials, stream, db) if oauth_credentials.get('oauth_refresh_token') else None
                 )
             else:
                 # For sources that don't need tokens (e.g., device-based)
@@ -190,72 +314,40 @@ def sync_stream(self, stream_id: str, manual: bool = False):
             # Run sync - handle both async and sync implementations
             if asyncio.iscoroutinefunction(sync.run):
                 # Async sync implementation
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    stats = loop.run_until_complete(sync.run())
-                finally:
-                    loop.close()
+                stats = await sync.run()
             else:
                 # Sync implementation
                 stats = sync.run()
 
-            # Update stream last_ingestion_at
-            db.execute(
-                text("""
-                    UPDATE stream_configs 
-                    SET last_ingestion_at = :last_ingestion_at,
-                        updated_at = :updated_at
-                    WHERE id = :id
-                """),
-                {
-                    "id": stream_id,
-                    "last_ingestion_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                }
-            )
-            
+            # Serialize run stats before opening the write transaction
+            activity_metadata = dumps_stats(stats)
+            completed_at = datetime.now(timezone.utc)
+
             # Update sync cursor if provided and stream instance exists
             if stats.get("next_sync_token") and stream.get("stream_instance_id"):
-                db.execute(
-                    text("""
-                        UPDATE streams 
-                        SET sync_cursor = :sync_cursor,
-                            last_sync_at = :last_sync_at,
-                            last_sync_status = 'success',
-                            updated_at = :updated_at
-                        WHERE id = :id
-                    """),
+                await db.execute(
+                    _UPDATE_STREAM_CURSOR,
                     {
                         "id": stream["stream_instance_id"],
                         "sync_cursor": stats["next_sync_token"],
-                        "last_sync_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
+                        "last_sync_at": completed_at,
+                        "updated_at": completed_at
                     }
                 )
 
-            # Update ingestion run
-            db.execute(
-                text("""
-                    UPDATE pipeline_activities 
-                    SET status = :status,
-                        completed_at = :completed_at,
-                        records_processed = :records_processed,
-                        updated_at = :updated_at,
-                        activity_metadata = :activity_metadata
-                    WHERE id = :id
-                """),
+            # Update stream last_ingestion_at and the ingestion run in one statement
+            await db.execute(
+                _COMPLETE_STREAM_ACTIVITY,
                 {
-                    "id": str(ingestion_run_id),
-                    "status": "completed",
-                    "completed_at": datetime.utcnow(),
+                    **_finish_params(ingestion_run_id, "completed", completed_at),
+                    "stream_id": stream_id,
+                    "last_ingestion_at": completed_at,
                     "records_processed": stats.get("records_processed", stats.get("events_processed", stats.get("locations_processed", 0))),
-                    "updated_at": datetime.utcnow(),
-                    "activity_metadata": json.dumps(json_serializable(stats))
+                    "activity_metadata": activity_metadata
                 }
             )
 
-            db.commit()
+            await db.commit()
 
             return {
                 "status": "success",
@@ -267,8 +359,9 @@ def sync_stream(self, stream_id: str, manual: bool = False):
 
         except Exception as e:
             # Log error
+            failed_at = datetime.now(timezone.utc)
             error_message = f"{type(e).__name__}: {str(e)}"
-            traceback.print_exc()
+            logger.exception("sync_stream failed for %s", stream_id)
 
             # Classify errors - don't retry certain types
             non_retryable_errors = (
@@ -281,60 +374,49 @@ def sync_stream(self, stream_id: str, manual: bool = False):
             
             should_retry = not any(error_type in error_message for error_type in non_retryable_errors)
 
+            # Clear any aborted transaction left by the failure before
+            # recording it, so the UPDATE doesn't fault on a poisoned session
+            await db.rollback()
+
             # Update pipeline activity
-            db.execute(
-                text("""
-                    UPDATE pipeline_activities 
-                    SET status = :status,
-                        completed_at = :completed_at,
-                        error_message = :error_message,
-                        updated_at = :updated_at
-                    WHERE id = :id
-                """),
+            await db.execute(
+                _FAIL_ACTIVITY,
                 {
-                    "id": str(ingestion_run_id),
-                    "status": "failed",
-                    "completed_at": datetime.utcnow(),
+                    **_finish_params(ingestion_run_id, "failed", failed_at),
                     # Truncate if too long
-                    "error_message": error_message[:1000],
-                    "updated_at": datetime.utcnow()
+                    "error_message": error_message[:1000]
                 }
             )
 
-            db.commit()
+            await db.commit()
             
             # Custom retry logic with exponential backoff
-            if should_retry and self.request.retries < self.max_retries:
+            if should_retry and task.request.retries < task.max_retries:
                 # Exponential backoff: 60s, 120s, 240s
-                countdown = 60 * (2 ** self.request.retries)
-                raise self.retry(countdown=countdown, exc=e)
+                countdown = 60 * (2 ** task.request.retries)
+                raise task.retry(countdown=countdown, exc=e)
             else:
                 # Don't retry or max retries reached
                 raise
 
-    finally:
-        db.close()
-
 
 # Keep the old sync_source task for backward compatibility
-@app.task(name="sync_source", bind=True,
+@app.task(name="sync_source", bind=True, acks_late=True,
           autoretry_for=(Exception,), retry_kwargs={'max_retries': 3})
 def sync_source(self, signal_id: str, manual: bool = False):
     """Generic task to sync any data source."""
+    return _get_loop().run_until_complete(_sync_source(self, signal_id, manual))
+
+
+async def _sync_source(task, signal_id: str, manual: bool):
+    """Body of sync_source, run on the worker loop over an AsyncSession."""
 
-    # Use sync database session
-    db = Session()
-    try:
+    async with AsyncSessionLocal() as db:
         # Get signal details
-        result = db.execute(
-            text("""
-                SELECT s.*, src.company, src.platform
-                FROM signals s 
-                JOIN sources src ON s.source_name = src.name
-                WHERE s.id = :signal_id
-            """),
+        result = (await db.execute(
+            _SELECT_SIGNAL,
             {"signal_id": signal_id}
-        ).first()
+        )).first()
 
         if not result:
             raise ValueError(f"Signal {signal_id} not found")
@@ -358,60 +440,40 @@ def sync_source(self, signal_id: str, manual: bool = False):
             # Source doesn't have a sync implementation (might be webhook-only)
             return {"status": "skipped", "reason": str(e)}
 
-        # Create ingestion run
-        ingestion_run_id = uuid4()
-
-        # Get source_name from signal
-        signal_info = db.execute(
-            text("SELECT source_name FROM signals WHERE id = :signal_id"),
-            {"signal_id": signal_id}
-        ).first()
+        # Look up OAuth tokens in the same transaction as the run INSERT so
+        # no transaction is left open on the connection while the sync runs
+        source_result = None
+        if hasattr(sync_class, 'requires_credentials') and sync_class.requires_credentials:
+            source_result = (await db.execute(
+                _SELECT_SIGNAL_OAUTH_SOURCE,
+                {
+                    "source_name": source_name
+                }
+            )).first()
 
-        if not signal_info:
-            raise ValueError(f"Signal {signal_id} not found")
+        # Create ingestion run; Postgres generates the id
+        started_at = datetime.now(timezone.utc)
 
-        db.execute(
-            text("""
-                INSERT INTO pipeline_activities 
-                (id, activity_type, activity_name, source_name, signal_id, 
-                 status, started_at, created_at, updated_at) 
-                VALUES (:id, :activity_type, :activity_name, :source_name, 
-                        :signal_id, :status, :started_at, :created_at, :updated_at)
-            """),
+        ingestion_run_id = (await db.execute(
+            _INSERT_SIGNAL_ACTIVITY,
             {
-                "id": str(ingestion_run_id),
                 "activity_type": "ingestion",
-                "activity_name": f"{signal_info.source_name}_ingestion",
-                "source_name": signal_info.source_name,
+                "activity_name": f"{source_name}_ingestion",
+                "source_name": source_name,
                 "signal_id": signal_id,
                 "status": "running",
-                "started_at": datetime.utcnow(),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "started_at": started_at,
+                "created_at": started_at,
+                "updated_at": started_at
             }
-        )
-        db.commit()
+        )).scalar_one()
+        await db.commit()
 
         try:
             # Check if source requires credentials
             oauth_credentials = None
-            if hasattr(sync_class, 'requires_credentials') and sync_class.requires_credentials:
-                # Get OAuth tokens from the sources table
-                source_result = db.execute(
-                    text("""
-                        SELECT oauth_access_token, oauth_refresh_token, oauth_expires_at, scopes
-                        FROM sources
-                        WHERE source_name = :source_name
-                        AND oauth_access_token IS NOT NULL
-                        LIMIT 1
-                    """),
-                    {
-                        "source_name": source_name
-                    }
-                ).first()
-
-                if source_result:
-                    oauth_credentials = dict(source_result._mapping)
+            if source_result:
+                oauth_credentials = dict(source_result._mapping)
 
             # Create signal object with necessary fields
             signal_obj = SignalWrapper(signal, oauth_credentials)
@@ -423,7 +485,7 @@ def sync_source(self, signal_id: str, manual: bool = False):
                     signal_obj,
                     oauth_credentials['oauth_access_token'],
                     token_refresher=create_token_refresher(
-                        source_name, oauth_credentials, signal_obj, db) if oauth_credentials.get('oauth_refresh_token') else None
+                        source_name, oauth_credentials, signal, db) if oauth_credentials.get('oauth_refresh_token') else None
                 )
             else:
                 # For sources that don't need tokens (e.g., device-based)
@@ -432,59 +494,34 @@ def sync_source(self, signal_id: str, manual: bool = False):
             # Run sync - handle both async and sync implementations
             if asyncio.iscoroutinefunction(sync.run):
                 # Async sync implementation
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    stats = loop.run_until_complete(sync.run())
-                finally:
-                    loop.close()
+                stats = await sync.run()
             else:
                 # Sync implementation
                 stats = sync.run()
 
+            # Serialize run stats before opening the write transaction
+            activity_metadata = dumps_stats(stats)
+            completed_at = datetime.now(timezone.utc)
+
             # Update signal
-            update_data = {"last_successful_ingestion_at": datetime.utcnow()}
+            update_data = {"last_successful_ingestion_at": completed_at}
             if stats.get("next_sync_token"):
                 update_data["sync_token"] = stats["next_sync_token"]
 
-            db.execute(
-                text("""
-                    UPDATE signals 
-                    SET last_successful_ingestion_at = :last_successful_ingestion_at,
-                        sync_token = :sync_token,
-                        updated_at = :updated_at
-                    WHERE id = :id
-                """),
+            # Update the signal and the ingestion run in one statement
+            await db.execute(
+                _COMPLETE_SIGNAL_ACTIVITY,
                 {
-                    "id": signal_id,
+                    **_finish_params(ingestion_run_id, "completed", completed_at),
+                    "signal_id": signal_id,
                     "last_successful_ingestion_at": update_data["last_successful_ingestion_at"],
                     "sync_token": update_data.get("sync_token", signal.get('sync_token')),
-                    "updated_at": datetime.utcnow()
-                }
-            )
-
-            # Update ingestion run
-            db.execute(
-                text("""
-                    UPDATE pipeline_activities 
-                    SET status = :status,
-                        completed_at = :completed_at,
-                        records_processed = :records_processed,
-                        updated_at = :updated_at,
-                        activity_metadata = :activity_metadata
-                    WHERE id = :id
-                """),
-                {
-                    "id": str(ingestion_run_id),
-                    "status": "completed",
-                    "completed_at": datetime.utcnow(),
                     "records_processed": stats.get("records_processed", stats.get("events_processed", stats.get("locations_processed", 0))),
-                    "updated_at": datetime.utcnow(),
-                    "activity_metadata": json.dumps(json_serializable(stats))
+                    "activity_metadata": activity_metadata
                 }
             )
 
-            db.commit()
+            await db.commit()
 
             return {
                 "status": "success",
@@ -495,177 +532,100 @@ def sync_source(self, signal_id: str, manual: bool = False):
 
         except Exception as e:
             # Log error
+            failed_at = datetime.now(timezone.utc)
             error_message = f"{type(e).__name__}: {str(e)}"
-            traceback.print_exc()
+            logger.exception("sync_source failed for %s", signal_id)
+
+            # Clear any aborted transaction left by the failure before
+            # recording it, so the UPDATE doesn't fault on a poisoned session
+            await db.rollback()
 
             # Update pipeline activity
-            db.execute(
-                text("""
-                    UPDATE pipeline_activities 
-                    SET status = :status,
-                        completed_at = :completed_at,
-                        error_message = :error_message,
-                        updated_at = :updated_at
-                    WHERE id = :id
-                """),
+            await db.execute(
+                _FAIL_ACTIVITY,
                 {
-                    "id": str(ingestion_run_id),
-                    "status": "failed",
-                    "completed_at": datetime.utcnow(),
+                    **_finish_params(ingestion_run_id, "failed", failed_at),
                     # Truncate if too long
-                    "error_message": error_message[:1000],
-                    "updated_at": datetime.utcnow()
+                    "error_message": error_message[:1000]
                 }
             )
 
-            db.commit()
+            await db.commit()
             raise
 
-    finally:
-        db.close()
-
 
 class SignalWrapper:
-    """Wrapper to make dict behave like an object for compatibility."""
+    """Wrapper to make dict behave like an object for compatibility.
+
+    Known fields are copied onto the instance up front so sync classes read
+    them as plain attributes; anything else falls back to ``__getattr__``.
+    """
 
     def __init__(self, signal_dict: dict, oauth_credentials: Optional[dict] = None):
         self._dict = signal_dict
         self._oauth_credentials = oauth_credentials
 
+        self.id = signal_dict['id']
+        self.signal_id = signal_dict.get('signal_id')
+        self.source_name = signal_dict['source_name']
+        self.sync_token = signal_dict.get('sync_token')
+        self.last_successful_ingestion_at = signal_dict.get('last_successful_ingestion_at')
+        self.is_active = signal_dict.get('status') == 'active'
+        self.fidelity_score = signal_dict.get('fidelity_score', 0.5)
+        self.description = signal_dict.get('description')
+        self.settings = signal_dict.get('settings', {})
+        self.device_token = signal_dict.get('device_token')
+        self.device_id_fk = signal_dict.get('device_id_fk')
+        self.signal_type = signal_dict.get('signal_type')
+        self.unit = signal_dict.get('unit_ucum')
+        self.computation = signal_dict.get('computation')
+
     def __getattr__(self, name):
         return self._dict.get(name)
 
     def __getitem__(self, key):
         return self._dict[key]
 
-    @property
-    def id(self):
-        return self._dict['id']
-
-    @property
-    def signal_id(self):
-        return self._dict['signal_id']
-
-    @property
-    def source_name(self):
-        return self._dict['source_name']
-
-    @property
-    def sync_token(self):
-        return self._dict.get('sync_token')
-
-    @property
-    def last_successful_ingestion_at(self):
-        return self._dict.get('last_successful_ingestion_at')
-
-    @property
-    def is_active(self):
-        return self._dict.get('status') == 'active'
-
-    @property
-    def fidelity_score(self):
-        return self._dict.get('fidelity_score', 0.5)
-
-    @property
-    def description(self):
-        return self._dict.get('description')
-
-    @property
-    def settings(self):
-        return self._dict.get('settings', {})
-
-    @property
-    def device_token(self):
-        return self._dict.get('device_token')
-
-    @property
-    def device_id_fk(self):
-        return self._dict.get('device_id_fk')
-
-    @property
-    def signal_type(self):
-        return self._dict.get('signal_type')
-
-    @property
-    def unit(self):
-        return self._dict.get('unit_ucum')
-
-    @property
-    def computation(self):
-        return self._dict.get('computation')
-
 
 class StreamWrapper:
-    """Wrapper to make stream dict behave like a signal object for compatibility."""
+    """Wrapper to make stream dict behave like a signal object for compatibility.
+
+    Known fields are copied onto the instance up front so sync classes read
+    them as plain attributes; anything else falls back to ``__getattr__``.
+    """
 
     def __init__(self, stream_dict: dict, oauth_credentials: Optional[dict] = None):
         self._dict = stream_dict
         self._oauth_credentials = oauth_credentials
 
+        self.id = stream_dict['id']
+        self.source_name = stream_dict['source_name']
+        self.stream_name = stream_dict['stream_name']
+        # For streams, we use last_ingestion_at
+        self.last_successful_ingestion_at = stream_dict.get('last_ingestion_at')
+        # Sync cursor for incremental syncs; sync_token is an alias for
+        # compatibility with Google Calendar
+        self.sync_cursor = stream_dict.get('sync_cursor')
+        self.sync_token = self.sync_cursor
+        self.is_active = stream_dict.get('status') == 'active'
+        # Merge instance settings with config settings
+        self.settings = {
+            **(stream_dict.get('settings') or {}),
+            **(stream_dict.get('instance_settings') or {})
+        }
+        # Use instance values if available, otherwise fall back to defaults
+        self.initial_sync_type = stream_dict.get('initial_sync_type', 'limited')
+        self.initial_sync_days = stream_dict.get('initial_sync_days', 90)
+        self.initial_sync_days_future = stream_dict.get('initial_sync_days_future', 30)
+        # Use instance schedule if available, otherwise config schedule
+        self.sync_schedule = stream_dict.get('instance_sync_schedule') or stream_dict.get('sync_schedule')
+
     def __getattr__(self, name):
         return self._dict.get(name)
 
     def __getitem__(self, key):
         return self._dict[key]
 
-    @property
-    def id(self):
-        return self._dict['id']
-
-    @property
-    def source_name(self):
-        return self._dict['source_name']
-
-    @property
-    def stream_name(self):
-        return self._dict['stream_name']
-
-    @property
-    def last_successful_ingestion_at(self):
-        # For streams, we use last_ingestion_at
-        return self._dict.get('last_ingestion_at')
-    
-    @property
-    def sync_cursor(self):
-        # Return the sync cursor for incremental syncs
-        return self._dict.get('sync_cursor')
-    
-    @property
-    def sync_token(self):
-        # Alias for compatibility with Google Calendar
-        return self.sync_cursor
-
-    @property
-    def is_active(self):
-        return self._dict.get('status') == 'active'
-
-    @property
-    def settings(self):
-        # Merge instance settings with config settings
-        config_settings = self._dict.get('settings', {})
-        instance_settings = self._dict.get('instance_settings', {})
-        return {**config_settings, **instance_settings}
-    
-    @property
-    def initial_sync_type(self):
-        # Use instance value if available, otherwise fall back to default
-        return self._dict.get('initial_sync_type', 'limited')
-    
-    @property
-    def initial_sync_days(self):
-        # Use instance value if available, otherwise fall back to default
-        return self._dict.get('initial_sync_days', 90)
-    
-    @property
-    def initial_sync_days_future(self):
-        # Use instance value if available, otherwise fall back to default
-        return self._dict.get('initial_sync_days_future', 30)
-    
-    @property
-    def sync_schedule(self):
-        # Use instance schedule if available, otherwise config schedule
-        return self._dict.get('instance_sync_schedule') or self._dict.get('sync_schedule')
-
 
 
 
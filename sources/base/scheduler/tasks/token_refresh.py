@@ -1,23 +1,96 @@
 """Token refresh tasks for OAuth sources."""
 
+import asyncio
 import json
 import logging
 import importlib
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import uuid4
 
 from sqlalchemy import text
-from croniter import croniter
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from sources.base.scheduler.celery_app import app
 from sources.base.storage.database import SyncSessionLocal as Session
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of provider token refreshes in flight at once
+TOKEN_REFRESH_CONCURRENCY = 16
 
-def create_token_refresher(source_name: str, oauth_credentials: dict, source_config: dict, db):
-    """Create a token refresher function for OAuth sources."""
+# Resolved token refresh functions keyed by source_name
+_REFRESH_FUNC_CACHE = {}
+
+
+def _resolve_refresh_func(source_name: str):
+    """Import the auth module for a source and return its refresh function."""
+    refresh_func = _REFRESH_FUNC_CACHE.get(source_name)
+    if refresh_func is not None:
+        return refresh_func
+
+    # Construct auth module path based on naming convention
+    # e.g., google -> sources.google.auth
+    auth_module_path = f"sources.{source_name}.auth"
+    logger.info(f"Trying to import auth module: {auth_module_path}")
+    
+    try:
+        auth_module = importlib.import_module(auth_module_path)
+    except ImportError as e:
+        logger.info(f"Failed to import {auth_module_path}, trying subdirectories")
+        # Try looking in subdirectories (e.g., google/calendar/auth.py)
+        # For google source, check in calendar subdirectory
+        if source_name == 'google':
+            auth_module_path = 'sources.google.calendar.auth'
+            logger.info(f"Trying Google Calendar auth module: {auth_module_path}")
+            auth_module = importlib.import_module(auth_module_path)
+        else:
+            # Some sources might have auth at a different level
+            # Try parent directory
+            parts = source_path.split('/')
+            if len(parts) > 1:
+                parent_path = '/'.join(parts[:-1])
+                auth_module_path = f"sources.{parent_path.replace('/', '.')}.auth"
+                auth_module = importlib.import_module(auth_module_path)
+            else:
+                raise e
+    
+    # Check for refresh_token function or refresh_google_token (backward compat)
+    if hasattr(auth_module, 'refresh_token'):
+        refresh_func = auth_module.refresh_token
+    elif hasattr(auth_module, 'refresh_google_token'):
+        refresh_func = auth_module.refresh_google_token
+    else:
+        logger.warning(f"No token refresh function found in {auth_module_path}")
+        return None
+
+    _REFRESH_FUNC_CACHE[source_name] = refresh_func
+    return refresh_func
+
+
+_UPDATE_SOURCE_TOKENS = text("""
+    UPDATE sources 
+    SET oauth_access_token = :access_token,
+        oauth_refresh_token = :refresh_token,
+        oauth_expires_at = :expires_at,
+        updated_at = :updated_at
+    WHERE id = :source_id
+""")
+
+
+def _token_update_params(oauth_credentials: dict, new_tokens: dict, now: datetime) -> dict:
+    """Bind params for writing a refreshed token set back to its source row."""
+    return {
+        "source_id": oauth_credentials.get('source_id'),
+        "access_token": new_tokens["access_token"],
+        "refresh_token": new_tokens.get("refresh_token", oauth_credentials['oauth_refresh_token']),
+        "expires_at": now + timedelta(seconds=new_tokens.get("expires_in", 3600)),
+        "updated_at": now
+    }
+
+
+def _oauth_refresh_func(source_name: str, source_config: dict):
+    """Return the source's refresh function, or None if it can't be refreshed."""
     
     # Check if source_config is None
     if source_config is None:
@@ -31,76 +104,9 @@ def create_token_refresher(source_name: str, oauth_credentials: dict, source_con
     
     logger.info(f"Found source config for {source_name}: auth type = oauth2")
     
-    # Dynamically import the auth module for this source
+    # Dynamically import the auth module for this source (cached per source)
     try:
-        # Construct auth module path based on naming convention
-        # e.g., google -> sources.google.auth
-        auth_module_path = f"sources.{source_name}.auth"
-        logger.info(f"Trying to import auth module: {auth_module_path}")
-        
-        try:
-            auth_module = importlib.import_module(auth_module_path)
-        except ImportError as e:
-            logger.info(f"Failed to import {auth_module_path}, trying subdirectories")
-            # Try looking in subdirectories (e.g., google/calendar/auth.py)
-            # For google source, check in calendar subdirectory
-            if source_name == 'google':
-                auth_module_path = 'sources.google.calendar.auth'
-                logger.info(f"Trying Google Calendar auth module: {auth_module_path}")
-                auth_module = importlib.import_module(auth_module_path)
-            else:
-                # Some sources might have auth at a different level
-                # Try parent directory
-                parts = source_path.split('/')
-                if len(parts) > 1:
-                    parent_path = '/'.join(parts[:-1])
-                    auth_module_path = f"sources.{parent_path.replace('/', '.')}.auth"
-                    auth_module = importlib.import_module(auth_module_path)
-                else:
-                    raise e
-        
-        # Check for refresh_token function or refresh_google_token (backward compat)
-        refresh_func = None
-        if hasattr(auth_module, 'refresh_token'):
-            refresh_func = auth_module.refresh_token
-        elif hasattr(auth_module, 'refresh_google_token'):
-            refresh_func = auth_module.refresh_google_token
-        else:
-            logger.warning(f"No token refresh function found in {auth_module_path}")
-            return None
-            
-        async def token_refresher():
-            """Generic token refresher."""
-            try:
-                # Call source-specific refresh logic
-                new_tokens = await refresh_func(oauth_credentials['oauth_refresh_token'])
-                
-                # Update tokens in sources table
-                db.execute(
-                    text("""
-                        UPDATE sources 
-                        SET oauth_access_token = :access_token,
-                            oauth_refresh_token = :refresh_token,
-                            oauth_expires_at = :expires_at,
-                            updated_at = :updated_at
-                        WHERE id = :source_id
-                    """),
-                    {
-                        "source_id": oauth_credentials.get('source_id'),
-                        "access_token": new_tokens["access_token"],
-                        "refresh_token": new_tokens.get("refresh_token", oauth_credentials['oauth_refresh_token']),
-                        "expires_at": datetime.utcnow() + timedelta(seconds=new_tokens.get("expires_in", 3600)),
-                        "updated_at": datetime.utcnow()
-                    }
-                )
-                db.commit()
-                
-                return new_tokens["access_token"]
-            except Exception as e:
-                raise Exception(f"Failed to refresh {source_name} token: {str(e)}")
-        
-        return token_refresher
-        
+        return _resolve_refresh_func(source_name)
     except ImportError as e:
         # Source doesn't have an auth module - that's okay for non-OAuth sources
         logger.debug(f"No auth module found for {source_name}: {e}")
@@ -110,6 +116,115 @@ def create_token_refresher(source_name: str, oauth_credentials: dict, source_con
         return None
 
 
+def create_token_refresher(
+    source_name: str,
+    oauth_credentials: dict,
+    source_config: dict,
+    db: AsyncSession
+):
+    """
+    Create a token refresher for OAuth sources that writes through an async session.
+    
+    The returned coroutine function refreshes the token, stores it on the
+    source row and returns the new access token.
+    """
+    refresh_func = _oauth_refresh_func(source_name, source_config)
+    if refresh_func is None:
+        return None
+    
+    async def token_refresher():
+        """Generic token refresher."""
+        try:
+            # Call source-specific refresh logic
+            new_tokens = await refresh_func(oauth_credentials['oauth_refresh_token'])
+            
+            # Update tokens in sources table
+            await db.execute(
+                _UPDATE_SOURCE_TOKENS,
+                _token_update_params(oauth_credentials, new_tokens, datetime.now(timezone.utc))
+            )
+            await db.commit()
+            
+            return new_tokens["access_token"]
+        except Exception as e:
+            raise Exception(f"Failed to refresh {source_name} token: {str(e)}")
+    
+    return token_refresher
+
+
+def _create_token_fetcher(source_name: str, oauth_credentials: dict, source_config: dict):
+    """
+    Create a coroutine function that refreshes a source's tokens without storing them.
+    
+    It returns (source_id, new_tokens); refresh_expiring_tokens writes every
+    successful refresh back in one statement once all of them are done.
+    """
+    refresh_func = _oauth_refresh_func(source_name, source_config)
+    if refresh_func is None:
+        return None
+    
+    async def fetch_tokens():
+        try:
+            new_tokens = await refresh_func(oauth_credentials['oauth_refresh_token'])
+        except Exception as e:
+            raise Exception(f"Failed to refresh {source_name} token: {str(e)}")
+        return oauth_credentials['source_id'], new_tokens
+    
+    return fetch_tokens
+
+
+async def _refresh_all(pending: list) -> list:
+    """Run token fetchers concurrently, returning (source, result, error) triples."""
+    semaphore = asyncio.Semaphore(TOKEN_REFRESH_CONCURRENCY)
+
+    async def refresh_one(source, fetch_tokens):
+        async with semaphore:
+            try:
+                return source, await fetch_tokens(), None
+            except Exception as e:
+                return source, None, str(e)
+
+    return await asyncio.gather(
+        *(refresh_one(source, fetcher) for source, fetcher in pending)
+    )
+
+
+def _write_refreshed_tokens(db, refreshed_tokens: list, now: datetime) -> None:
+    """
+    Store refreshed tokens for many sources with a single UPDATE ... FROM (VALUES ...).
+    
+    Args:
+        db: Synchronous session; committed once after the write
+        refreshed_tokens: (source_id, old_refresh_token, new_tokens) triples
+        now: Timestamp the expiries are computed from
+    """
+    rows = []
+    params = {"updated_at": now}
+    for i, (source_id, old_refresh_token, new_tokens) in enumerate(refreshed_tokens):
+        rows.append(
+            f"(CAST(:id_{i} AS uuid), :access_token_{i}, :refresh_token_{i}, "
+            f"CAST(:expires_at_{i} AS timestamptz))"
+        )
+        params[f"id_{i}"] = str(source_id)
+        params[f"access_token_{i}"] = new_tokens["access_token"]
+        params[f"refresh_token_{i}"] = new_tokens.get("refresh_token", old_refresh_token)
+        params[f"expires_at_{i}"] = now + timedelta(seconds=new_tokens.get("expires_in", 3600))
+    
+    db.execute(
+        text(f"""
+            UPDATE sources 
+            SET oauth_access_token = v.access_token,
+                oauth_refresh_token = v.refresh_token,
+                oauth_expires_at = v.expires_at,
+                updated_at = :updated_at
+            FROM (VALUES {", ".join(rows)}) AS v(id, access_token, refresh_token, expires_at)
+            WHERE sources.id = v.id
+        """),
+        params
+    )
+    db.commit()
+
+
 @app.task(name="refresh_expiring_tokens")
 def refresh_expiring_tokens():
     """Proactively refresh tokens that are about to expire."""
@@ -119,6 +234,7 @@ def refresh_expiring_tokens():
     try:
         # Create pipeline activity record
         activity_id = str(uuid4())
+        started_at = datetime.now(timezone.utc)
         db.execute(
             text("""
                 INSERT INTO pipeline_activities 
@@ -127,17 +243,21 @@ def refresh_expiring_tokens():
             """),
             {
                 "id": activity_id,
-                "started_at": datetime.utcnow(),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "started_at": started_at,
+                "created_at": started_at,
+                "updated_at": started_at
             }
         )
         db.commit()
 
-        # Find credentials that expire within the next hour
-        expiry_threshold = datetime.utcnow() + timedelta(hours=1)
+        # Find credentials that expire within the next hour; bound as an
+        # aware UTC timestamptz so no session time zone conversion applies
+        expiry_threshold = started_at + timedelta(hours=1)
 
-        # Find sources with tokens that need refreshing
+        # Find sources with tokens that need refreshing. Fetched in full:
+        # every row is collected before refreshing starts, and the
+        # refreshers commit on this session, which would close a
+        # server-side cursor mid-iteration
         result = db.execute(
             text("""
                 SELECT s.id, s.source_name, s.instance_name, s.oauth_access_token, 
@@ -149,54 +269,68 @@ def refresh_expiring_tokens():
                 AND s.status IN ('authenticated', 'active')
             """),
             {"expiry_threshold": expiry_threshold}
-        ).fetchall()
+        )
 
         refreshed = []
         failed = []
-        sources_checked = len(result)
+        sources_checked = 0
 
+        # Build a token fetcher per source up front; the provider round-trips
+        # then run concurrently on a single event loop, and the new tokens
+        # are written back together afterwards
+        pending = []
         for row in result:
-            source_dict = dict(row._mapping)
+            sources_checked += 1
             try:
                 # Skip non-OAuth sources (e.g., device sources)
-                if not source_dict.get('oauth_refresh_token'):
+                if not row.oauth_refresh_token:
                     continue
 
-                # Create a token refresher and call it
-                source_dict['source_id'] = source_dict['id']  # Add source_id for the refresher
-                token_refresher = create_token_refresher(
-                    source_dict['source_name'], 
-                    source_dict, 
-                    source_dict,  # Pass source_dict as the config too
-                    db
+                # Create a token fetcher; the row mapping is a read-only
+                # view, so only the fields the fetcher reads are copied. The
+                # query doesn't select auth_type, but only sources holding an
+                # OAuth refresh token reach this point
+                fetch_tokens = _create_token_fetcher(
+                    row.source_name, 
+                    {"source_id": row.id, "oauth_refresh_token": row.oauth_refresh_token}, 
+                    {**row._mapping, "auth_type": "oauth2"}
                 )
                 
-                if token_refresher:
-                    # Run the token refresher
-                    import asyncio
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        new_token = loop.run_until_complete(token_refresher())
-                        refreshed.append({
-                            "source": source_dict['source_name'],
-                            "instance": source_dict.get('instance_name', 'unknown')
-                        })
-                        logger.info(f"Successfully refreshed token for {source_dict['source_name']}")
-                    finally:
-                        loop.close()
+                if fetch_tokens:
+                    pending.append((row, fetch_tokens))
                 else:
                     logger.warning(
-                        f"No token refresher available for source {source_dict['source_name']}"
+                        f"No token refresher available for source {row.source_name}"
                     )
 
             except Exception as e:
                 failed.append({
-                    "source": source_dict['source_name'],
-                    "instance": source_dict.get('instance_name', 'unknown'),
+                    "source": row.source_name,
+                    "instance": row.instance_name or 'unknown',
                     "error": str(e)
                 })
 
+        if pending:
+            outcomes = asyncio.run(_refresh_all(pending))
+            refreshed_tokens = []
+            for row, fetched, error in outcomes:
+                entry = {
+                    "source": row.source_name,
+                    "instance": row.instance_name or 'unknown'
+                }
+                if error is None:
+                    source_id, new_tokens = fetched
+                    refreshed_tokens.append((source_id, row.oauth_refresh_token, new_tokens))
+                    refreshed.append(entry)
+                    logger.info(f"Successfully refreshed token for {row.source_name}")
+                else:
+                    entry["error"] = error
+                    failed.append(entry)
+            
+            # One round trip and one commit for every successful refresh
+            if refreshed_tokens:
+                _write_refreshed_tokens(db, refreshed_tokens, datetime.now(timezone.utc))
+
         # Update pipeline activity with results
         db.execute(
             text("""
@@ -211,7 +345,7 @@ def refresh_expiring_tokens():
             {
                 "id": activity_id,
                 "status": "completed" if len(failed) == 0 else "completed",
-                "completed_at": datetime.utcnow(),
+                "completed_at": datetime.now(timezone.utc),
                 "records_processed": sources_checked,
                 "metadata": json.dumps({
                     "sources_checked": sources_checked,
@@ -219,7 +353,7 @@ def refresh_expiring_tokens():
                     "failed": len(failed),
                     "expiry_threshold": expiry_threshold.isoformat()
                 }),
-                "updated_at": datetime.utcnow()
+                "updated_at": datetime.now(timezone.utc)
             }
         )
         db.commit()
@@ -244,9 +378,9 @@ def refresh_expiring_tokens():
                 """),
                 {
                     "id": activity_id,
-                    "completed_at": datetime.utcnow(),
+                    "completed_at": datetime.now(timezone.utc),
                     "error_message": str(e)[:1000],
-                    "updated_at": datetime.utcnow()
+                    "updated_at": datetime.now(timezone.utc)
                 }
             )
             db.commit()
@@ -31,6 +31,9 @@ class DatabaseManager:
             "postgresql+asyncpg://", "postgresql://", 1
         )
         
+        # Sync pool sizing, matched to Celery worker concurrency
+        self.sync_pool_size = int(os.getenv("DB_SYNC_POOL_SIZE", "5"))
+        
         # Create engines
         self._async_engine = None
         self._sync_engine = None
@@ -57,7 +60,19 @@ class DatabaseManager:
             self._sync_engine = create_engine(
                 self.sync_url,
                 echo=False,
-                pool_pre_ping=True
+                pool_pre_ping=True,
+                # LIFO keeps reusing the warmest connections and lets idle
+                # ones age out instead of cycling through the whole pool
+                pool_use_lifo=True,
+                pool_size=self.sync_pool_size,
+                max_overflow=self.sync_pool_size,
+                pool_recycle=1800,
+                # Route executemany() through psycopg2's batch helpers so
+                # list-parameter text() upserts (e.g. stream processors)
+                # are sent as paged batches rather than one row per trip
+                executemany_mode="values_plus_batch",
+                executemany_batch_page_size=500,
+                insertmanyvalues_page_size=1000
             )
         return self._sync_engine
     
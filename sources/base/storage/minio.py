@@ -1,13 +1,39 @@
 """Unified MinIO storage service for all sources."""
 
-from typing import Any, Optional, List, Dict
-from datetime import datetime
+from typing import Any, AsyncIterator, Optional, List, Dict
+from datetime import datetime, timedelta, timezone
+import asyncio
 import aioboto3
+import gzip
+import io
 import os
-import json
+import logging
 from pathlib import Path
 from uuid import uuid4
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
+from botocore.exceptions import ClientError
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Shared botocore settings: a pool large enough for concurrent batch
+# operations, and adaptive retries that back off on 503 Slow Down
+_S3_CONFIG = Config(
+    signature_version='s3v4',
+    max_pool_connections=64,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+# Payloads at or above this size are uploaded as concurrent multipart parts
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+# Number of per-day list requests issued concurrently
+LIST_CONCURRENCY = 8
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+# Number of DeleteObjects requests issued concurrently
+DELETE_CONCURRENCY = 8
 
 
 def get_minio_config() -> Dict[str, Any]:
@@ -22,10 +48,35 @@ def get_minio_config() -> Dict[str, Any]:
     }
 
 
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive datetimes as UTC so they compare with S3 timestamps."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _filter_modified(
+    objects: List[Dict[str, Any]],
+    since: Optional[datetime],
+    until: Optional[datetime]
+) -> List[Dict[str, Any]]:
+    """Keep objects whose LastModified falls within [since, until]."""
+    filtered = []
+    for obj in objects:
+        last_modified = obj.get('LastModified')
+        if last_modified:
+            if since and last_modified < since:
+                continue
+            if until and last_modified > until:
+                continue
+            filtered.append(obj)
+    return filtered
+
+
 class MinIOClient:
     """Async MinIO client for storing and retrieving raw source data."""
     
-    def __init__(self):
+    def __init__(self, transfer_config: Optional[TransferConfig] = None):
         # Get MinIO configuration from centralized config
         config = get_minio_config()
         
@@ -38,8 +89,77 @@ class MinIOClient:
         self.secret_key = config['secret_key']
         self.use_ssl = config['use_ssl']
         self.default_bucket = config['bucket']
+        self.region = config['region']
         
         self.session = aioboto3.Session()
+        
+        # Multipart settings for large uploads
+        self.transfer_config = transfer_config or TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD,
+            multipart_chunksize=8 * 1024 * 1024,
+            max_concurrency=10,
+            use_threads=False
+        )
+        
+        # One S3 client per instance, created on first use and bound to the
+        # event loop that created it. The lock is created lazily as well so
+        # it always belongs to the loop that uses it
+        self._client_cm = None
+        self._client = None
+        self._client_loop = None
+        self._client_lock = None
+        self._lock_loop = None
+    
+    async def _get_client(self):
+        """Return the cached S3 client, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._client_loop is loop:
+            return self._client
+        
+        if self._client_lock is None or self._lock_loop is not loop:
+            self._client_lock = asyncio.Lock()
+            self._lock_loop = loop
+        
+        async with self._client_lock:
+            if self._client is not None and self._client_loop is not loop:
+                # Created on a loop that has since gone away; its connector
+                # can't be reused here, so release it before replacing it
+                await self._close_stale_client()
+            if self._client is None:
+                self._client_cm = self.session.client(
+                    "s3",
+                    endpoint_url=self.endpoint_url,
+                    aws_access_key_id=self.access_key,
+                    aws_secret_access_key=self.secret_key,
+                    use_ssl=self.use_ssl,
+                    region_name=self.region,
+                    config=_S3_CONFIG
+                )
+                self._client = await self._client_cm.__aenter__()
+                self._client_loop = loop
+        return self._client
+    
+    async def _close_stale_client(self) -> None:
+        """Close a client left behind by a previous event loop."""
+        client_cm = self._client_cm
+        self._client_cm = None
+        self._client = None
+        self._client_loop = None
+        try:
+            await client_cm.__aexit__(None, None, None)
+        except Exception as e:
+            # The owning loop may already be closed; the sockets are dropped
+            # with it, so there's nothing more to release
+            logger.debug("Failed to close stale S3 client: %s", e)
+    
+    async def aclose(self) -> None:
+        """Close the cached S3 client and its connection pool."""
+        if self._client_cm is not None:
+            client_cm = self._client_cm
+            self._client_cm = None
+            self._client = None
+            self._client_loop = None
+            await client_cm.__aexit__(None, None, None)
     
     async def put_raw_data(
         self,
@@ -109,7 +229,8 @@ class MinIOClient:
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
         bucket: Optional[str] = None,
-        max_keys: int = 1000
+        max_keys: int = 1000,
+        filename: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         List files for a specific source and connection with optional time filtering.
@@ -121,35 +242,81 @@ class MinIOClient:
             until: Optional end timestamp
             bucket: Optional bucket name (defaults to configured bucket)
             max_keys: Maximum number of keys to return
+            filename: Optional exact filename to look up instead of listing
             
         Returns:
             List of file metadata dictionaries
         """
-        prefix = f"{source_name}/{connection_id}/"
-        
-        # If we have time bounds, we could optimize the prefix
-        # For now, we'll list all and filter
-        objects = await self.list_objects(
-            bucket=bucket or self.default_bucket,
-            prefix=prefix,
-            max_keys=max_keys
-        )
+        bucket = bucket or self.default_bucket
+        since = _as_utc(since)
+        until = _as_utc(until)
         
-        # Filter by time if provided
-        if since or until:
-            filtered = []
-            for obj in objects:
-                last_modified = obj.get('LastModified')
-                if last_modified:
-                    if since and last_modified < since:
-                        continue
-                    if until and last_modified > until:
-                        continue
-                    filtered.append(obj)
-            return filtered
+        if since and until:
+            # Keys are laid out as source/YYYY/MM/DD/connection/filename, so a
+            # bounded range only needs the day prefixes it covers
+            first_day = since.date()
+            last_day = until.date()
+            days = [
+                first_day + timedelta(days=i)
+                for i in range((last_day - first_day).days + 1)
+            ]
+            semaphore = asyncio.Semaphore(LIST_CONCURRENCY)
+            
+            async def list_day(day) -> List[Dict[str, Any]]:
+                prefix = f"{source_name}/{day:%Y/%m/%d}/{connection_id}/"
+                async with semaphore:
+                    if filename:
+                        # The full key is known, so a HEAD replaces the listing
+                        found = await self.head_object(bucket, prefix + filename)
+                        return [found] if found else []
+                    return await self.list_objects(
+                        bucket=bucket,
+                        prefix=prefix,
+                        max_keys=max_keys
+                    )
+            
+            per_day = await asyncio.gather(*(list_day(day) for day in days))
+            
+            objects = []
+            for day, day_objects in zip(days, per_day):
+                if day in (first_day, last_day):
+                    # Only the boundary days can hold objects outside the range
+                    day_objects = _filter_modified(day_objects, since, until)
+                objects.extend(day_objects)
+            return objects[:max_keys]
         
+        # Open-ended range: page through the whole source, filtering while
+        # listing so other connections' keys don't count against max_keys
+        objects = []
+        async for page in self._iter_connection_pages(
+            bucket, source_name, connection_id, since, until, filename
+        ):
+            objects.extend(page)
+            if len(objects) >= max_keys:
+                return objects[:max_keys]
         return objects
     
+    async def _iter_connection_pages(
+        self,
+        bucket: str,
+        source_name: str,
+        connection_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        filename: Optional[str] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield every listing page under source_name, filtered to one connection."""
+        async for page in self.iter_objects(bucket, prefix=f"{source_name}/"):
+            matched = [
+                obj for obj in page
+                if obj["Key"].split("/")[4:5] == [connection_id]
+                and (not filename or obj["Key"].rsplit("/", 1)[-1] == filename)
+            ]
+            if since or until:
+                matched = _filter_modified(matched, since, until)
+            if matched:
+                yield matched
+    
     async def delete_old_data(
         self,
         source_name: str,
@@ -169,32 +336,51 @@ class MinIOClient:
         Returns:
             Number of objects deleted
         """
-        objects = await self.list_source_files(
-            source_name=source_name,
-            connection_id=connection_id,
-            until=older_than,
-            bucket=bucket
-        )
+        # Stream matching keys into DeleteObjects batches of at most
+        # DELETE_BATCH_SIZE keys (the API limit) as the listing pages in,
+        # with a bounded number of batches in flight
+        s3 = await self._get_client()
+        bucket = bucket or self.default_bucket
+        older_than = _as_utc(older_than)
+        semaphore = asyncio.Semaphore(DELETE_CONCURRENCY)
         
-        if not objects:
-            return 0
+        async def delete_batch(batch: List[Dict[str, str]]) -> int:
+            try:
+                # Quiet mode only reports errors, so count successes ourselves
+                response = await s3.delete_objects(
+                    Bucket=bucket,
+                    Delete={"Objects": batch, "Quiet": True}
+                )
+            finally:
+                semaphore.release()
+            return len(batch) - len(response.get("Errors", []))
         
-        # Delete objects in batches
-        async with self.session.client(
-            "s3",
-            endpoint_url=self.endpoint_url,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            use_ssl=self.use_ssl
-        ) as s3:
-            delete_objects = [{"Key": obj["Key"]} for obj in objects]
-            
-            response = await s3.delete_objects(
-                Bucket=bucket or self.default_bucket,
-                Delete={"Objects": delete_objects}
-            )
-            
-            return len(response.get("Deleted", []))
+        tasks = []
+        pending: List[Dict[str, str]] = []
+        try:
+            async for page in self._iter_connection_pages(
+                bucket, source_name, connection_id, until=older_than
+            ):
+                pending.extend({"Key": obj["Key"]} for obj in page)
+                while len(pending) >= DELETE_BATCH_SIZE:
+                    batch = pending[:DELETE_BATCH_SIZE]
+                    del pending[:DELETE_BATCH_SIZE]
+                    # Acquire before scheduling so listing waits for a free
+                    # slot instead of queueing unbounded delete tasks
+                    await semaphore.acquire()
+                    tasks.append(asyncio.create_task(delete_batch(batch)))
+            if pending:
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(delete_batch(pending)))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        if not tasks:
+            return 0
+        deleted = await asyncio.gather(*tasks)
+        return sum(deleted)
     
     # Lower-level methods (migrated from original MinIOStorage)
     
@@ -206,31 +392,47 @@ class MinIOClient:
         content_type: str = "application/octet-stream"
     ) -> None:
         """Store an object in MinIO."""
-        async with self.session.client(
-            "s3",
-            endpoint_url=self.endpoint_url,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            use_ssl=self.use_ssl
-        ) as s3:
-            await s3.put_object(
+        s3 = await self._get_client()
+        if len(data) >= self.transfer_config.multipart_threshold:
+            # Large bodies go up as parallel parts instead of one long PUT
+            await s3.upload_fileobj(
+                Fileobj=io.BytesIO(data),
                 Bucket=bucket,
                 Key=key,
-                Body=data,
-                ContentType=content_type
+                ExtraArgs={"ContentType": content_type},
+                Config=self.transfer_config
             )
+            return
+        
+        await s3.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type
+        )
     
     async def get_object(self, bucket: str, key: str) -> bytes:
         """Retrieve an object from MinIO."""
-        async with self.session.client(
-            "s3",
-            endpoint_url=self.endpoint_url,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            use_ssl=self.use_ssl
-        ) as s3:
-            response = await s3.get_object(Bucket=bucket, Key=key)
-            return await response["Body"].read()
+        s3 = await self._get_client()
+        response = await s3.get_object(Bucket=bucket, Key=key)
+        async with response["Body"] as body:
+            return await body.read()
+    
+    async def head_object(self, bucket: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return listing-style metadata for key, or None if it doesn't exist."""
+        s3 = await self._get_client()
+        try:
+            response = await s3.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return {
+            "Key": key,
+            "LastModified": response.get("LastModified"),
+            "Size": response.get("ContentLength"),
+            "ETag": response.get("ETag")
+        }
     
     async def list_objects(
         self,
@@ -238,20 +440,51 @@ class MinIOClient:
         prefix: Optional[str] = None,
         max_keys: int = 1000
     ) -> list:
-        """List objects in a bucket with optional prefix."""
-        async with self.session.client(
-            "s3",
-            endpoint_url=self.endpoint_url,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            use_ssl=self.use_ssl
-        ) as s3:
-            params = {"Bucket": bucket, "MaxKeys": max_keys}
-            if prefix:
-                params["Prefix"] = prefix
-            
-            response = await s3.list_objects_v2(**params)
-            return response.get("Contents", [])
+        """List up to max_keys objects in a bucket with optional prefix."""
+        results = []
+        async for page in self.iter_objects(bucket, prefix=prefix, max_keys=max_keys):
+            results.extend(page)
+        return results
+    
+    async def iter_objects(
+        self,
+        bucket: str,
+        prefix: Optional[str] = None,
+        max_keys: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield pages of objects in a bucket, following continuation tokens."""
+        s3 = await self._get_client()
+        paginator = s3.get_paginator("list_objects_v2")
+        pagination_config = {"PageSize": 1000}
+        if max_keys is not None:
+            pagination_config["MaxItems"] = max_keys
+        
+        async for page in paginator.paginate(
+            Bucket=bucket,
+            Prefix=prefix or "",
+            PaginationConfig=pagination_config
+        ):
+            contents = page.get("Contents", [])
+            if contents:
+                yield contents
+
+
+# Shared client for the standalone helpers below
+_default_client: Optional[MinIOClient] = None
+
+
+def _get_default_client() -> MinIOClient:
+    """Return the module-wide MinIOClient, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        _default_client = MinIOClient()
+    return _default_client
+
+
+async def close_default_client() -> None:
+    """Close the module-wide client, e.g. before its event loop is closed."""
+    if _default_client is not None:
+        await _default_client.aclose()
 
 
 # Standalone functions for backward compatibility
@@ -265,36 +498,32 @@ async def store_raw_data(
     # Generate key based on stream and date
     date_path = timestamp.strftime("%Y/%m/%d")
     file_id = uuid4().hex
-    key = f"streams/{stream_name}/{date_path}/{file_id}.json"
-    
-    # Convert data to JSON
-    json_data = json.dumps(data, default=str).encode('utf-8')
+    key = f"streams/{stream_name}/{date_path}/{file_id}.json.gz"
     
-    # Get MinIO configuration
-    config = get_minio_config()
-    endpoint = config['endpoint'].replace('http://', '').replace('https://', '')
+    # Convert data to JSON and gzip it; level 1 keeps most of the size win
+    # for a fraction of the CPU
+    # orjson emits bytes directly and encodes datetimes natively
+    raw = orjson.dumps(
+        data,
+        default=str,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    )
+    json_data = gzip.compress(raw, compresslevel=1)
     
-    # Create S3 client
-    session = aioboto3.Session()
-    async with session.client(
-        's3',
-        endpoint_url=f"{'https' if config['use_ssl'] else 'http'}://{endpoint}",
-        aws_access_key_id=config['access_key'],
-        aws_secret_access_key=config['secret_key'],
-        config=Config(signature_version='s3v4'),
-        region_name=config['region']
-    ) as s3:
-        # Upload to MinIO
-        await s3.put_object(
-            Bucket=config['bucket'],
-            Key=key,
-            Body=json_data,
-            ContentType='application/json',
-            Metadata={
-                'connection_id': connection_id,
-                'stream_name': stream_name,
-                'timestamp': timestamp.isoformat()
-            }
-        )
+    # Upload to MinIO over the shared client
+    client = _get_default_client()
+    s3 = await client._get_client()
+    await s3.put_object(
+        Bucket=client.default_bucket,
+        Key=key,
+        Body=json_data,
+        ContentType='application/json',
+        ContentEncoding='gzip',
+        Metadata={
+            'connection_id': connection_id,
+            'stream_name': stream_name,
+            'timestamp': timestamp.isoformat()
+        }
+    )
     
     return key
\ No newline at end of file
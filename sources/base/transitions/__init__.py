@@ -1,11 +1,14 @@
 """Transition detection algorithms for signal processing."""
 
-from .categorical import BaseCategoricalTransitionDetector, Transition
+from .categorical import BaseCategoricalTransitionDetector, SignalArrays, Transition
 
-# Note: Import BasePELTTransitionDetector only when needed to avoid numpy dependency
+# Note: Import BasePELTTransitionDetector only when needed; it requires ruptures
+# and numba, which categorical-only detectors don't need.
+# numpy itself is always loaded, since categorical.py builds SignalArrays with it
 # from .pelt import BasePELTTransitionDetector
 
 __all__ = [
     'BaseCategoricalTransitionDetector',
+    'SignalArrays',
     'Transition'
 ]
\ No newline at end of file
@@ -0,0 +1,276 @@
+"""Numba-compiled PELT for 1-D signals with L1/L2 segment costs.
+
+Mirrors ruptures' Pelt search (same jump/min_size candidate grid, min_size
+floor per cost, and pruning rule) for the "l1" and "l2" models, but runs the
+admissible-set loop as compiled code. Results usually equal
+``rpt.Pelt(model=..., min_size=...)`` but are not guaranteed to: when two
+segmentations have equal (or, in floating point, nearly equal) penalized
+cost, the two implementations can pick different breakpoints.
+
+Segment costs are O(1) for L2 (prefix sums) and O(log n) for L1: a wavelet
+matrix over the value ranks answers "median of x[s:e] and sum of the values
+below it" without sorting the segment.
+
+Importing this module raises ImportError when numba isn't installed; callers
+fall back to ruptures in that case.
+"""
+
+import numpy as np
+from numba import njit
+
+# ruptures' default spacing between candidate breakpoints
+DEFAULT_JUMP = 5
+
+_COST_L2 = 0
+_COST_L1 = 1
+
+# ruptures' CostL2.min_size / CostL1.min_size; Pelt uses
+# max(min_size, cost.min_size)
+_MIN_SIZE = {"l2": 1, "l1": 2}
+
+
+@njit(cache=True, nogil=True)
+def _build_rank_index(x):
+    """
+    Wavelet matrix over the ranks of x, with per-level prefix sums.
+
+    Returns (sorted_x, zeros, zero_sums, n_zeros): zeros[level, i] counts the
+    0 bits among the first i entries at that level, zero_sums[level, i] sums
+    their values, and n_zeros[level] is the level's total 0 count.
+    """
+    n = x.shape[0]
+    order = np.argsort(x, kind='mergesort')
+    sorted_x = x[order]
+    ranks = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        ranks[order[i]] = i
+
+    levels = 1
+    while (1 << levels) < n:
+        levels += 1
+
+    zeros = np.zeros((levels, n + 1), dtype=np.int64)
+    zero_sums = np.zeros((levels, n + 1))
+    n_zeros = np.zeros(levels, dtype=np.int64)
+
+    cur = ranks.copy()
+    cur_x = x.copy()
+    next_r = np.empty(n, dtype=np.int64)
+    next_x = np.empty(n)
+    for level in range(levels):
+        bit = levels - 1 - level
+        for i in range(n):
+            is_zero = ((cur[i] >> bit) & 1) == 0
+            zeros[level, i + 1] = zeros[level, i] + (1 if is_zero else 0)
+            zero_sums[level, i + 1] = zero_sums[level, i] + (cur_x[i] if is_zero else 0.0)
+        n_zeros[level] = zeros[level, n]
+
+        # Stable partition: 0 bits first, then 1 bits
+        lo = 0
+        hi = n_zeros[level]
+        for i in range(n):
+            if ((cur[i] >> bit) & 1) == 0:
+                next_r[lo] = cur[i]
+                next_x[lo] = cur_x[i]
+                lo += 1
+            else:
+                next_r[hi] = cur[i]
+                next_x[hi] = cur_x[i]
+                hi += 1
+        cur, next_r = next_r, cur
+        cur_x, next_x = next_x, cur_x
+
+    return sorted_x, zeros, zero_sums, n_zeros
+
+
+@njit(cache=True, nogil=True)
+def _kth_with_sum(zeros, zero_sums, n_zeros, start, end, k):
+    """Rank of the k-th smallest of x[start:end] and the sum of the k below it."""
+    levels = zeros.shape[0]
+    rank = 0
+    below = 0.0
+    for level in range(levels):
+        z_start = zeros[level, start]
+        z_end = zeros[level, end]
+        count = z_end - z_start
+        if k < count:
+            start = z_start
+            end = z_end
+        else:
+            below += zero_sums[level, end] - zero_sums[level, start]
+            k -= count
+            rank |= 1 << (levels - 1 - level)
+            start = n_zeros[level] + (start - z_start)
+            end = n_zeros[level] + (end - z_end)
+    return rank, below
+
+
+@njit(cache=True, nogil=True)
+def _segment_cost(csum, csum2, sorted_x, zeros, zero_sums, n_zeros, start, end, cost_kind):
+    """Cost of the segment x[start:end]."""
+    size = end - start
+    s = csum[end] - csum[start]
+    if cost_kind == _COST_L2:
+        # Sum of squared deviations from the mean, from prefix sums
+        return (csum2[end] - csum2[start]) - s * s / size
+    # Sum of absolute deviations from the median. For even sizes any point
+    # between the two middle values gives the same sum, so use the upper one
+    k = size // 2
+    rank, below = _kth_with_sum(zeros, zero_sums, n_zeros, start, end, k)
+    median = sorted_x[rank]
+    return s - 2.0 * below + median * (2 * k - size)
+
+
+@njit(cache=True, nogil=True)
+def _pelt(n, csum, csum2, sorted_x, zeros, zero_sums, n_zeros, pen, min_size, jump, cost_kind):
+    """PELT over a signal of length n; returns the sorted breakpoints, ending with n."""
+
+    # F[t] is the best penalized cost of x[:t]; inf where no partition exists
+    F = np.full(n + 1, np.inf)
+    F[0] = 0.0
+    last = np.full(n + 1, -1, dtype=np.int64)
+
+    admissible = np.empty(n + 2, dtype=np.int64)
+    values = np.empty(n + 2)
+    n_admissible = 0
+
+    bkp = 0
+    while True:
+        # Candidate breakpoints: multiples of jump that are >= min_size, then n
+        if bkp < min_size:
+            bkp = ((min_size + jump - 1) // jump) * jump
+        if bkp >= n:
+            bkp = n
+
+        admissible[n_admissible] = ((bkp - min_size) // jump) * jump
+        n_admissible += 1
+
+        best = np.inf
+        best_t = -1
+        for j in range(n_admissible):
+            t = admissible[j]
+            if F[t] == np.inf:
+                values[j] = np.inf
+                continue
+            value = F[t] + _segment_cost(
+                csum, csum2, sorted_x, zeros, zero_sums, n_zeros, t, bkp, cost_kind
+            ) + pen
+            values[j] = value
+            if value < best:
+                best = value
+                best_t = t
+        F[bkp] = best
+        last[bkp] = best_t
+
+        # Pruning: drop starts that can never beat the optimum again
+        kept = 0
+        for j in range(n_admissible):
+            if values[j] <= best + pen:
+                admissible[kept] = admissible[j]
+                kept += 1
+        n_admissible = kept
+
+        if bkp == n:
+            break
+        bkp += jump
+
+    # Backtrack from the end of the signal
+    count = 0
+    t = n
+    while t > 0:
+        count += 1
+        t = last[t]
+    bkps = np.empty(count, dtype=np.int64)
+    t = n
+    for i in range(count - 1, -1, -1):
+        bkps[i] = t
+        t = last[t]
+    return bkps
+
+
+@njit(cache=True, nogil=True)
+def pelt_l2(x, csum, csum2, pen, min_size, jump):
+    """PELT with the L2 (squared deviation) cost, using prefix sums of x and x*x."""
+    empty = np.empty(0)
+    empty_levels = np.empty((0, 0), dtype=np.int64)
+    return _pelt(
+        x.shape[0], csum, csum2, empty, empty_levels, np.empty((0, 0)),
+        np.empty(0, dtype=np.int64), pen, min_size, jump, _COST_L2
+    )
+
+
+@njit(cache=True, nogil=True)
+def pelt_l1(x, csum, pen, min_size, jump):
+    """PELT with the L1 (absolute deviation from the median) cost."""
+    sorted_x, zeros, zero_sums, n_zeros = _build_rank_index(x)
+    return _pelt(
+        x.shape[0], csum, np.empty(0), sorted_x, zeros, zero_sums, n_zeros,
+        pen, min_size, jump, _COST_L1
+    )
+
+
+@njit(cache=True, nogil=True)
+def changepoint_confidences(
+    means, stds, sizes, cv_thresh, cv_scores, size_thresh, size_pen, min_conf
+):
+    """
+    Confidence of each changepoint between consecutive segments.
+
+    Same rule as BasePELTTransitionDetector._calculate_changepoint_confidence:
+    a stability score from the average coefficient of variation of the two
+    segments, minus a penalty for the smaller segment's size, clamped to
+    [min_conf, 1]. Returns one value per boundary (len(means) - 1).
+    """
+    out = np.empty(means.shape[0] - 1)
+    for i in range(out.shape[0]):
+        before_cv = stds[i] / means[i] if means[i] != 0.0 else 1.0
+        after_cv = stds[i + 1] / means[i + 1] if means[i + 1] != 0.0 else 1.0
+        avg_cv = (before_cv + after_cv) / 2
+
+        # First threshold the value is below; NaN falls through to the last bucket
+        bucket = 0
+        while bucket < cv_thresh.shape[0] and not avg_cv < cv_thresh[bucket]:
+            bucket += 1
+        stability_score = cv_scores[bucket]
+
+        min_size = min(sizes[i], sizes[i + 1])
+        bucket = 0
+        while bucket < size_thresh.shape[0] and not min_size < size_thresh[bucket]:
+            bucket += 1
+
+        confidence = stability_score - size_pen[bucket]
+        out[i] = max(min_conf, min(1.0, confidence))
+    return out
+
+
+def pelt_changepoints(
+    signal: np.ndarray,
+    cost_function: str,
+    pen: float,
+    min_size: int,
+    jump: int = DEFAULT_JUMP
+) -> np.ndarray:
+    """
+    Run the compiled PELT on a 1-D signal.
+
+    Args:
+        signal: 1-D array of values
+        cost_function: "l1" or "l2"
+        pen: Penalty per added segment
+        min_size: Minimum number of points per segment, raised to the
+            cost's own minimum as ruptures does
+        jump: Spacing between candidate breakpoints
+
+    Returns:
+        Sorted breakpoint indices, ending with len(signal) like ruptures
+    """
+    if cost_function not in _MIN_SIZE:
+        raise ValueError(f"Unsupported cost function for compiled PELT: {cost_function}")
+    min_size = max(int(min_size), _MIN_SIZE[cost_function])
+
+    x = np.ascontiguousarray(signal, dtype=np.float64)
+    csum = np.concatenate((np.zeros(1), np.cumsum(x)))
+    if cost_function == "l2":
+        csum2 = np.concatenate((np.zeros(1), np.cumsum(x * x)))
+        return pelt_l2(x, csum, csum2, float(pen), min_size, int(jump))
+    return pelt_l1(x, csum, float(pen), min_size, int(jump))
@@ -3,11 +3,53 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from operator import itemgetter
+import logging
+import os
+import threading
 import uuid
 
+import numpy as np
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+
+def _uuid_stream(chunk: int = 1024):
+    """Yield random (version 4) UUID strings, reading entropy a chunk at a time."""
+    while True:
+        blob = os.urandom(16 * chunk)
+        for i in range(0, 16 * chunk, 16):
+            yield str(uuid.UUID(bytes=blob[i:i + 16], version=4))
+
+
+_UUIDS = _uuid_stream()
+_UUIDS_LOCK = threading.Lock()
+
+
+def _reset_uuid_stream() -> None:
+    """Drop the inherited entropy buffer so forked children never share ids."""
+    global _UUIDS, _UUIDS_LOCK
+    _UUIDS = _uuid_stream()
+    _UUIDS_LOCK = threading.Lock()
+
+
+# Celery prefork children are forked after the parent may have drawn ids
+os.register_at_fork(after_in_child=_reset_uuid_stream)
+
+
+def _next_uuid() -> str:
+    """Return the next UUID string from the shared stream."""
+    with _UUIDS_LOCK:
+        return next(_UUIDS)
+
+
+def _epoch_ns(timestamp: datetime) -> int:
+    """Epoch nanoseconds of a datetime, rounded via microseconds like SignalArrays.ts."""
+    return round(timestamp.timestamp() * 1_000_000) * 1000
+
+
+@dataclass(slots=True)
 class Transition:
     """Represents a detected changepoint or data gap in a signal."""
     transition_time: datetime
@@ -21,11 +63,16 @@ class Transition:
     confidence: float
     detection_method: str
     metadata: Optional[Dict[str, Any]] = None
+    # transition_time as epoch nanoseconds, for integer gap arithmetic
+    _ts_ns: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._ts_ns = _epoch_ns(self.transition_time)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for database insertion."""
         return {
-            "id": str(uuid.uuid4()),
+            "id": _next_uuid(),
             "transition_time": self.transition_time,
             "transition_type": self.transition_type,
             "change_magnitude": self.change_magnitude,
@@ -40,6 +87,16 @@ class Transition:
         }
 
 
+class SignalArrays:
+    """Signals as parallel arrays, for scans that only need time and value."""
+    __slots__ = ('ts', 'value', 'raw')
+
+    def __init__(self, ts: np.ndarray, value: np.ndarray, raw: List[Dict[str, Any]]):
+        self.ts = ts  # int64 nanoseconds since the epoch
+        self.value = value  # float64, or object for non-numeric signals
+        self.raw = raw  # the signal dicts, in the same order
+
+
 class BaseCategoricalTransitionDetector(ABC):
     """
     Base class for implementing signal-specific transition detection.
@@ -77,8 +134,13 @@ class BaseCategoricalTransitionDetector(ABC):
         """
         Detect transitions in the given signals.
 
+        Implementations that scan timestamps or values should build
+        ``self._to_soa(signals)`` once and reuse its arrays, including for
+        detect_collection_periods.
+
         Args:
-            signals: List of signal dictionaries from the database
+            signals: List of signal dictionaries from the database, ordered
+                by timestamp ascending (the signal queries ORDER BY timestamp)
             start_time: Start of the time window
             end_time: End of the time window
 
@@ -87,6 +149,42 @@ class BaseCategoricalTransitionDetector(ABC):
         """
         pass
 
+    def _to_soa(self, signals: List[Dict[str, Any]]) -> SignalArrays:
+        """Convert a list of signal dicts into parallel timestamp/value arrays."""
+        # Round via microseconds so float timestamps map to exact int64 ns
+        ts = np.fromiter(
+            (round(s['timestamp'].timestamp() * 1_000_000) for s in signals),
+            dtype=np.int64,
+            count=len(signals)
+        ) * 1000
+
+        values = [s.get('signal_value') for s in signals]
+        try:
+            value = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            value = np.asarray(values, dtype=object)
+
+        return SignalArrays(ts, value, signals)
+
+    def _ordered_soa(self, arrays: SignalArrays) -> SignalArrays:
+        """
+        Return arrays in timestamp order.
+
+        Callers pass signals fetched with ORDER BY timestamp, so this is
+        normally a single O(n) check; an out-of-order window is logged and
+        stably re-sorted rather than failing the whole detection.
+        """
+        ts = arrays.ts
+        if len(ts) < 2 or not (ts[1:] < ts[:-1]).any():
+            return arrays
+        logger.warning(
+            "%s: signals are not ordered by timestamp; sorting %d signals",
+            self.get_signal_name(), len(ts)
+        )
+        order = np.argsort(ts, kind='stable')
+        raw = arrays.raw
+        return SignalArrays(ts[order], arrays.value[order], [raw[i] for i in order.tolist()])
+
     def validate_transitions(
         self,
         transitions: List[Transition],
@@ -104,26 +202,31 @@ class BaseCategoricalTransitionDetector(ABC):
         Returns:
             Validated transitions
         """
-        validated = []
+        min_confidence = self.min_confidence
+        keyed = []
 
         for transition in transitions:
+            # Filter by confidence threshold
+            if transition.confidence < min_confidence:
+                continue
             # Ensure transition is within time window
             # Make transition_time offset-naive if needed for comparison
-            trans_time = transition.transition_time.replace(tzinfo=None) if transition.transition_time.tzinfo else transition.transition_time
+            transition_time = transition.transition_time
+            trans_time = transition_time.replace(tzinfo=None) if transition_time.tzinfo else transition_time
             if start_time <= trans_time <= end_time:
-                # Filter by confidence threshold
-                if transition.confidence >= self.min_confidence:
-                    validated.append(transition)
+                keyed.append((transition_time, transition))
 
-        # Sort by transition time
-        validated.sort(key=lambda t: t.transition_time)
+        # Sort by transition time, extracted once during the filter pass
+        keyed.sort(key=itemgetter(0))
 
-        return validated
+        return [transition for _, transition in keyed]
 
     def detect_collection_periods(
         self,
         signals: List[Dict[str, Any]],
-        gap_threshold_seconds: int = 300  # 5 minutes default
+        gap_threshold_seconds: int = 300,  # 5 minutes default
+        assume_sorted: bool = False,
+        arrays: Optional[SignalArrays] = None
     ) -> List[Tuple[datetime, datetime, List[Dict[str, Any]]]]:
         """
         Detect periods of continuous data collection based on gaps between signals.
@@ -131,6 +234,11 @@ class BaseCategoricalTransitionDetector(ABC):
         Args:
             signals: List of signal dictionaries from the database
             gap_threshold_seconds: Maximum seconds between signals to consider continuous
+            assume_sorted: Skip sorting when signals are already ordered by
+                timestamp (e.g. fetched with ORDER BY timestamp); the order is
+                verified in O(n) and re-sorted with a warning if it's wrong
+            arrays: Optional precomputed _to_soa() of the ordered signals,
+                verified the same way
 
         Returns:
             List of tuples: (start_time, end_time, signals_in_period)
@@ -138,42 +246,27 @@ class BaseCategoricalTransitionDetector(ABC):
         if not signals:
             return []
 
-        # Sort signals by timestamp
-        sorted_signals = sorted(signals, key=lambda s: s['timestamp'])
-
-        periods = []
-        current_period_start = sorted_signals[0]['timestamp']
-        current_period_signals = [sorted_signals[0]]
-
-        for i in range(1, len(sorted_signals)):
-            current_signal = sorted_signals[i]
-            prev_signal = sorted_signals[i-1]
-
-            # Calculate time gap
-            time_gap = (current_signal['timestamp'] -
-                        prev_signal['timestamp']).total_seconds()
-
-            if time_gap > gap_threshold_seconds:
-                # Gap detected - end current period
-                periods.append((
-                    current_period_start,
-                    prev_signal['timestamp'],
-                    current_period_signals
-                ))
-
-                # Start new period
-                current_period_start = current_signal['timestamp']
-                current_period_signals = [current_signal]
-            else:
-                # Continue current period
-                current_period_signals.append(current_signal)
-
-        # Add final period
-        if current_period_signals:
-            periods.append((
-                current_period_start,
-                current_period_signals[-1]['timestamp'],
-                current_period_signals
-            ))
-
-        return periods
+        if arrays is None and not assume_sorted:
+            # Sort signals by timestamp unless the query already did
+            arrays = self._to_soa(sorted(signals, key=itemgetter('timestamp')))
+        else:
+            # Trusted order (assume_sorted or precomputed arrays) is still
+            # checked; a violation falls back to sorting
+            arrays = self._ordered_soa(arrays if arrays is not None else self._to_soa(signals))
+        sorted_signals = arrays.raw
+
+        # A new period starts at every index whose gap from the previous
+        # signal exceeds the threshold
+        gaps = np.diff(arrays.ts)
+        breaks = np.flatnonzero(gaps > gap_threshold_seconds * 1_000_000_000) + 1
+        starts = [0] + breaks.tolist()
+        ends = breaks.tolist() + [len(sorted_signals)]
+
+        return [
+            (
+                sorted_signals[start]['timestamp'],
+                sorted_signals[end - 1]['timestamp'],
+                sorted_signals[start:end]
+            )
+            for start, end in zip(starts, ends)
+        ]
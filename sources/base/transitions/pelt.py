@@ -1,8 +1,15 @@
 """Base class for PELT-based transition detectors."""
 
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple, Union
 from abc import abstractmethod
+from bisect import bisect_right
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import math
+import os
+import threading
 import numpy as np
 
 try:
@@ -10,7 +17,77 @@ try:
 except ImportError:
     raise ImportError("ruptures library required for PELT detection. Install with: pip install ruptures")
 
-from sources.base.transitions.categorical import BaseCategoricalTransitionDetector, Transition
+from sources.base.transitions.categorical import (
+    BaseCategoricalTransitionDetector, SignalArrays, Transition, _epoch_ns
+)
+
+try:
+    from sources.base.transitions._pelt_numba import changepoint_confidences, pelt_changepoints
+except ImportError:
+    # numba not installed; every cost function goes through ruptures and
+    # confidences are scored per changepoint
+    changepoint_confidences = None
+    pelt_changepoints = None
+
+logger = logging.getLogger(__name__)
+
+# Threads shared by every detector in the process for running collection
+# periods concurrently. Kept small: each Celery prefork child gets its own
+# pool, so the total is worker concurrency x this
+PELT_MAX_WORKERS = int(os.getenv("PELT_MAX_WORKERS", "2"))
+
+_PELT_POOL: Optional[ThreadPoolExecutor] = None
+_PELT_POOL_LOCK = threading.Lock()
+
+
+def _get_pelt_pool() -> ThreadPoolExecutor:
+    """Return the process-wide PELT thread pool, creating it on first use."""
+    global _PELT_POOL
+    if _PELT_POOL is None:
+        with _PELT_POOL_LOCK:
+            if _PELT_POOL is None:
+                _PELT_POOL = ThreadPoolExecutor(
+                    max_workers=PELT_MAX_WORKERS,
+                    thread_name_prefix="pelt"
+                )
+    return _PELT_POOL
+
+
+def _reset_pelt_pool() -> None:
+    """Forget the parent's pool in a forked child; its threads don't survive the fork."""
+    global _PELT_POOL, _PELT_POOL_LOCK
+    _PELT_POOL = None
+    _PELT_POOL_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_pelt_pool)
+
+
+class _RawChangepoint(NamedTuple):
+    """
+    A PELT changepoint before it becomes a Transition.
+    
+    Carries the attributes merging and validation read, so only the
+    changepoints that survive them pay for a Transition and its metadata.
+    """
+    transition_time: datetime
+    change_magnitude: float
+    change_direction: str
+    before_mean: float
+    before_std: float
+    after_mean: float
+    after_std: float
+    confidence: float
+    before_size: int
+    after_size: int
+    changepoint_index: int
+    ts_ns: int
+    
+    transition_type = 'changepoint'
+    
+    @property
+    def _ts_ns(self) -> int:
+        return self.ts_ns
 
 
 class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
@@ -29,6 +106,18 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
     - Transition creation
     """
     
+    # Set by subclasses whose extract_signal_values is float(signal_value);
+    # their PELT input is then sliced from the SoA built once per call
+    uses_raw_signal_value: bool = False
+    
+    # Changepoint confidence tables: a value below THRESH[i] (and not below
+    # any earlier threshold) scores SCORES[i]; at or above every threshold
+    # it scores the last entry
+    _CV_THRESH = (0.1, 0.2, 0.3)
+    _CV_SCORES = (0.95, 0.85, 0.75, 0.65)
+    _SIZE_THRESH = (10, 20)
+    _SIZE_PEN = (0.1, 0.05, 0.0)
+    
     def __init__(
         self,
         min_confidence: float = 0.8,
@@ -59,6 +148,9 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
             self.gap_threshold_seconds = gap_threshold_seconds
             self.min_segment_size = min_segment_size
             self.penalty_multiplier = penalty_multiplier
+        
+        # ruptures models keep the fitted signal, so each PELT thread gets its own
+        self._pelt_local = threading.local()
     
     def detect_transitions(
         self,
@@ -75,12 +167,43 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
         transitions = []
         
         # Layer 1: Detect collection periods (handles gaps)
+        values, arrays = self._split_signals(signals)
         collection_periods = self.detect_collection_periods(
             signals, 
-            self.gap_threshold_seconds
+            self.gap_threshold_seconds,
+            assume_sorted=True,
+            arrays=arrays
         )
         
-        # Process each collection period
+        # Layer 2: Run PELT within each long-enough collection period. Periods
+        # are independent, so they run on a thread pool; the compiled PELT
+        # and NumPy release the GIL for the heavy part
+        min_period_size = self.min_segment_size * 2
+        pelt_jobs = {}
+        offset = 0
+        for i, (_, _, period_signals) in enumerate(collection_periods):
+            size = len(period_signals)
+            if size >= min_period_size:
+                period_values = values[offset:offset + size] if values is not None else None
+                pelt_jobs[i] = (period_signals, period_values)
+            offset += size
+        pelt_results = {}
+        if len(pelt_jobs) > 1 and PELT_MAX_WORKERS > 1:
+            executor = _get_pelt_pool()
+            futures = {
+                i: executor.submit(self._run_pelt_detection, *job)
+                for i, job in pelt_jobs.items()
+            }
+            pelt_results = {i: future.result() for i, future in futures.items()}
+        else:
+            pelt_results = {
+                i: self._run_pelt_detection(*job)
+                for i, job in pelt_jobs.items()
+            }
+        
+        # Stitch collection start/stop and PELT transitions back in order.
+        # Track whether anything besides collection-stop transitions was added
+        only_stop_transitions = True
         for i, (period_start, period_end, period_signals) in enumerate(collection_periods):
             # Add collection started transition
             collection_start_transition = self.create_collection_transition(
@@ -92,11 +215,12 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
             )
             if collection_start_transition:
                 transitions.append(collection_start_transition)
+                only_stop_transitions = False
             
-            # Layer 2: Run PELT within this collection period
-            if len(period_signals) >= self.min_segment_size * 2:
-                pelt_transitions = self._run_pelt_detection(period_signals)
-                transitions.extend(pelt_transitions)
+            # PELT transitions found within this collection period
+            if pelt_results.get(i):
+                transitions.extend(pelt_results[i])
+                only_stop_transitions = False
             
             # Add collection stopped transition
             # Ensure period_end is offset-naive for comparison
@@ -117,60 +241,119 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
                 if collection_stop_transition:
                     transitions.append(collection_stop_transition)
         
-        # Merge transitions that are too close together
-        transitions = self.merge_close_transitions(transitions)
+        # Merge transitions that are too close together. Stop transitions
+        # alone are one per period end, already in order and more than
+        # gap_threshold_seconds apart, so there is nothing to merge unless
+        # the merge gap is wider than that
+        min_gap_seconds = getattr(self, 'min_transition_gap', 300)
+        if not only_stop_transitions or min_gap_seconds > self.gap_threshold_seconds:
+            transitions = self.merge_close_transitions(transitions)
+        
+        transitions = self.validate_transitions(transitions, start_time, end_time)
         
-        return self.validate_transitions(transitions, start_time, end_time)
+        # Build Transitions only for the changepoints that survived
+        return [self._materialize_transition(t) for t in transitions]
+    
+    def _split_signals(
+        self,
+        signals: List[Dict[str, Any]]
+    ) -> Tuple[Optional[np.ndarray], SignalArrays]:
+        """
+        Split signals into parallel arrays once per detect_transitions call.
+        
+        Returns:
+            (values, arrays): float64 PELT input for the whole window, or None
+            when values must come from extract_signal_values per period, and
+            the SoA arrays (int64 ns timestamps) for the gap scan
+        """
+        # Ordered before the values are taken, so the per-period value
+        # slices line up with detect_collection_periods' periods
+        arrays = self._ordered_soa(self._to_soa(signals))
+        values = arrays.value
+        if (
+            not self.uses_raw_signal_value
+            or values.dtype != np.float64
+            or np.isnan(values).any()
+        ):
+            # Derived values, or missing/non-numeric readings that
+            # extract_signal_values should see (and reject) itself
+            return None, arrays
+        return values, arrays
     
     def _run_pelt_detection(
         self, 
-        signals: List[Dict[str, Any]]
-    ) -> List[Transition]:
+        signals: List[Dict[str, Any]],
+        values: Optional[np.ndarray] = None
+    ) -> List[_RawChangepoint]:
         """
         Run PELT algorithm on a collection period's signals.
+        
+        Args:
+            signals: The period's signal dictionaries
+            values: Precomputed values for these signals, if already split
         """
-        # Extract signal values
-        values = self.extract_signal_values(signals)
+        # Extract signal values unless they were split up front
+        if values is None:
+            values = self.extract_signal_values(signals)
         if len(values) < self.min_segment_size * 2:
             return []
         
-        # Convert to numpy array for ruptures
-        signal_array = np.array(values)
+        # Contiguous float64 up front (no copy if it already is), so neither
+        # the compiled PELT nor ruptures has to convert it again
+        signal_array = np.ascontiguousarray(values, dtype=np.float64)
         
         # Get cost function and penalty
         cost_function = self.get_cost_function()
         penalty_value = self.get_penalty_value(signal_array)
         
-        # Create and fit PELT model
-        model = rpt.Pelt(model=cost_function, min_size=self.min_segment_size)
-        model.fit(signal_array)
-        
-        # Find change points
+        # Find change points, with the compiled PELT for L1/L2 on 1-D data
+        # and ruptures' Pelt (same jump and min_size) for everything else
         try:
-            change_points = model.predict(pen=penalty_value)
+            if (
+                pelt_changepoints is not None
+                and cost_function in ("l1", "l2")
+                and signal_array.ndim == 1
+            ):
+                change_points = pelt_changepoints(
+                    signal_array, cost_function, penalty_value, self.min_segment_size
+                ).tolist()
+            else:
+                model = self._get_pelt_model(cost_function)
+                model.fit(
+                    signal_array.reshape(-1, 1) if signal_array.ndim == 1 else signal_array
+                )
+                change_points = model.predict(pen=penalty_value)
         except Exception as e:
             # If PELT fails, return empty list
-            print(f"PELT detection failed: {e}")
+            logger.warning("PELT detection failed: %s", e)
             return []
         
         # Convert change points to transitions
-        transitions = self._convert_changepoints_to_transitions(
-            signals, values, change_points
+        return self._convert_changepoints_to_transitions(
+            signals, signal_array, change_points
         )
-        
-        return transitions
+    
+    def _get_pelt_model(self, cost_function: str) -> "rpt.Pelt":
+        """Return this thread's ruptures Pelt instance, reusing it across periods."""
+        model = getattr(self._pelt_local, 'model', None)
+        if model is None or self._pelt_local.cost_function != cost_function:
+            model = rpt.Pelt(model=cost_function, min_size=self.min_segment_size)
+            self._pelt_local.model = model
+            self._pelt_local.cost_function = cost_function
+        return model
     
     def _convert_changepoints_to_transitions(
         self,
         signals: List[Dict[str, Any]],
-        values: List[float],
+        values: np.ndarray,
         change_points: List[int]
-    ) -> List[Transition]:
+    ) -> List[_RawChangepoint]:
         """
-        Convert PELT change points to transitions.
-        """
-        transitions = []
+        Convert PELT change points to raw changepoint records.
         
+        detect_transitions turns the ones that survive merging and validation
+        into Transitions with _materialize_transition.
+        """
         # Change points include the end of data, so we ignore the last one
         if not change_points or change_points[-1] == len(values):
             change_points = change_points[:-1]
@@ -181,63 +364,98 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
         # Add 0 to beginning for first segment
         segment_boundaries = [0] + change_points + [len(values)]
         
+        # Prefix sums of x and x*x give every segment's mean/std at once
+        arr = np.asarray(values, dtype=np.float64)
+        csum = np.concatenate(([0.0], arr.cumsum()))
+        csum2 = np.concatenate(([0.0], (arr * arr).cumsum()))
+        bounds = np.asarray(segment_boundaries)
+        sizes = np.diff(bounds)
+        means = (csum[bounds[1:]] - csum[bounds[:-1]]) / sizes
+        variances = (csum2[bounds[1:]] - csum2[bounds[:-1]]) / sizes - means * means
+        stds = np.sqrt(np.maximum(variances, 0.0))
+        
+        # One transition per interior boundary, filled in place
+        n_changepoints = len(segment_boundaries) - 2
+        transitions = [None] * n_changepoints
+        
+        # Score every changepoint in one compiled call unless a subclass
+        # customizes the per-changepoint confidence
+        confidences = None
+        if (
+            changepoint_confidences is not None
+            and type(self)._calculate_changepoint_confidence
+            is BasePELTTransitionDetector._calculate_changepoint_confidence
+        ):
+            confidences = changepoint_confidences(
+                means, stds, sizes.astype(np.float64),
+                np.asarray(self._CV_THRESH), np.asarray(self._CV_SCORES),
+                np.asarray(self._SIZE_THRESH, dtype=np.float64), np.asarray(self._SIZE_PEN),
+                float(self.min_confidence)
+            ).tolist()
+        
+        means = means.tolist()
+        stds = stds.tolist()
+        sizes = sizes.tolist()
+        
         # Process each changepoint
-        for i in range(1, len(segment_boundaries) - 1):
-            # Get before and after segments
-            before_start = segment_boundaries[i-1]
-            before_end = segment_boundaries[i]
+        for i in range(1, n_changepoints + 1):
+            # Statistics of the segments before and after this boundary
             after_start = segment_boundaries[i]
-            after_end = segment_boundaries[i+1]
-            
-            before_values = values[before_start:before_end]
-            after_values = values[after_start:after_end]
-            
-            # Calculate statistics
-            before_mean = float(np.mean(before_values)) if before_values else None
-            before_std = float(np.std(before_values)) if before_values else None
-            after_mean = float(np.mean(after_values)) if after_values else None
-            after_std = float(np.std(after_values)) if after_values else None
+            before = (means[i - 1], stds[i - 1], sizes[i - 1])
+            after = (means[i], stds[i], sizes[i])
+            before_mean, before_std, before_size = before
+            after_mean, after_std, after_size = after
             
             # Calculate change characteristics
-            if before_mean is not None and after_mean is not None:
-                change_magnitude = abs(after_mean - before_mean)
-                change_direction = 'increase' if after_mean > before_mean else 'decrease'
-            else:
-                change_magnitude = None
-                change_direction = None
+            change_magnitude = abs(after_mean - before_mean)
+            change_direction = 'increase' if after_mean > before_mean else 'decrease'
             
             # Calculate confidence based on segment stability
-            confidence = self._calculate_changepoint_confidence(
-                before_values, after_values, signals[after_start]['timestamp']
-            )
+            transition_time = signals[after_start]['timestamp']
+            if confidences is not None:
+                confidence = confidences[i - 1]
+            else:
+                confidence = self._calculate_changepoint_confidence(
+                    before, after, transition_time
+                )
             
-            # Create transition
-            transition = Transition(
-                transition_time=signals[after_start]['timestamp'],
-                transition_type='changepoint',
-                change_magnitude=change_magnitude,
-                change_direction=change_direction,
-                before_mean=before_mean,
-                before_std=before_std,
-                after_mean=after_mean,
-                after_std=after_std,
-                confidence=confidence,
-                detection_method='pelt_changepoint',
-                metadata={
-                    'before_segment_size': len(before_values),
-                    'after_segment_size': len(after_values),
-                    'changepoint_index': i
-                }
+            transitions[i - 1] = _RawChangepoint(
+                transition_time, change_magnitude, change_direction,
+                before_mean, before_std, after_mean, after_std, confidence,
+                before_size, after_size, i, _epoch_ns(transition_time)
             )
-            
-            transitions.append(transition)
         
         return transitions
     
+    def _materialize_transition(
+        self,
+        transition: Union[Transition, _RawChangepoint]
+    ) -> Transition:
+        """Turn a raw PELT changepoint into a Transition; Transitions pass through."""
+        if not isinstance(transition, _RawChangepoint):
+            return transition
+        return Transition(
+            transition_time=transition.transition_time,
+            transition_type='changepoint',
+            change_magnitude=transition.change_magnitude,
+            change_direction=transition.change_direction,
+            before_mean=transition.before_mean,
+            before_std=transition.before_std,
+            after_mean=transition.after_mean,
+            after_std=transition.after_std,
+            confidence=transition.confidence,
+            detection_method='pelt_changepoint',
+            metadata={
+                'before_segment_size': transition.before_size,
+                'after_segment_size': transition.after_size,
+                'changepoint_index': transition.changepoint_index
+            }
+        )
+    
     # Abstract methods that subclasses must implement
     
     @abstractmethod
-    def extract_signal_values(self, signals: List[Dict[str, Any]]) -> List[float]:
+    def extract_signal_values(self, signals: List[Dict[str, Any]]) -> np.ndarray:
         """
         Extract numerical values from signals for PELT analysis.
         
@@ -245,7 +463,7 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
             signals: List of signal dictionaries
             
         Returns:
-            List of float values
+            1-D float64 array of values (a list of floats is also accepted)
         """
         pass
     
@@ -283,7 +501,7 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
         """
         n = len(signal_array)
         # BIC penalty
-        penalty = np.log(n) * self.penalty_multiplier
+        penalty = math.log(n) * self.penalty_multiplier
         return penalty
     
     def create_collection_transition(
@@ -335,51 +553,38 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
     
     def _calculate_changepoint_confidence(
         self,
-        before_values: List[float],
-        after_values: List[float],
+        before: Tuple[float, float, int],
+        after: Tuple[float, float, int],
         transition_time: datetime
     ) -> float:
         """
         Calculate confidence for a changepoint based on segment characteristics.
         
         Args:
-            before_values: Values before the changepoint
-            after_values: Values after the changepoint
+            before: (mean, std, size) of the segment before the changepoint
+            after: (mean, std, size) of the segment after the changepoint
             transition_time: When the transition occurred
             
         Returns:
             Confidence score between 0 and 1
         """
-        if not before_values or not after_values:
+        before_mean, before_std, before_size = before
+        after_mean, after_std, after_size = after
+        if not before_size or not after_size:
             return 0.5
         
         # Calculate coefficient of variation for each segment
-        before_mean = np.mean(before_values)
-        after_mean = np.mean(after_values)
-        
-        before_cv = np.std(before_values) / before_mean if before_mean != 0 else 1.0
-        after_cv = np.std(after_values) / after_mean if after_mean != 0 else 1.0
+        before_cv = before_std / before_mean if before_mean != 0 else 1.0
+        after_cv = after_std / after_mean if after_mean != 0 else 1.0
         
         # Lower CV means more stable segment, higher confidence
         avg_cv = (before_cv + after_cv) / 2
         
-        if avg_cv < 0.1:
-            stability_score = 0.95
-        elif avg_cv < 0.2:
-            stability_score = 0.85
-        elif avg_cv < 0.3:
-            stability_score = 0.75
-        else:
-            stability_score = 0.65
+        stability_score = self._CV_SCORES[bisect_right(self._CV_THRESH, avg_cv)]
         
         # Adjust based on segment sizes
-        min_segment_size = min(len(before_values), len(after_values))
-        if min_segment_size < 10:
-            size_penalty = 0.1
-        elif min_segment_size < 20:
-            size_penalty = 0.05
-        else:
-            size_penalty = 0.0
+        min_segment_size = min(before_size, after_size)
+        size_penalty = self._SIZE_PEN[bisect_right(self._SIZE_THRESH, min_segment_size)]
         
         confidence = stability_score - size_penalty
         return max(self.min_confidence, min(1.0, confidence))
@@ -390,6 +595,7 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
         Merge transitions that are too close together based on signal configuration.
         
         This helps reduce micro-transitions that don't represent meaningful activity changes.
+        Raw PELT changepoints are accepted too; unmerged ones are returned as-is.
         """
         if len(transitions) <= 1:
             return transitions
@@ -397,32 +603,27 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
         # Get min_transition_gap from signal config (will be set by subclasses)
         min_gap_seconds = getattr(self, 'min_transition_gap', 300)  # Default 5 minutes
         
-        # Sort transitions by time
-        sorted_transitions = sorted(transitions, key=lambda t: t.transition_time)
+        # Sort transitions by time (stable, like sorted()) on their cached ns
+        times = np.fromiter(
+            (t._ts_ns for t in transitions),
+            dtype=np.int64,
+            count=len(transitions)
+        )
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        sorted_transitions = [transitions[i] for i in order.tolist()]
         
-        merged = []
-        current_group = [sorted_transitions[0]]
+        # A group ends wherever the gap to the next transition reaches the
+        # minimum; consecutive transitions closer than that are merged
+        cuts = np.flatnonzero(np.diff(times) >= min_gap_seconds * 1_000_000_000) + 1
+        bounds = [0] + cuts.tolist() + [len(sorted_transitions)]
         
-        for i in range(1, len(sorted_transitions)):
-            transition = sorted_transitions[i]
-            last_in_group = current_group[-1]
-            
-            # Check time gap from last transition in current group
-            gap_seconds = (transition.transition_time - last_in_group.transition_time).total_seconds()
-            
-            if gap_seconds < min_gap_seconds:
-                # Too close, add to current group
-                current_group.append(transition)
-            else:
-                # Far enough, finalize current group and start new one
-                merged_transition = self._merge_transition_group(current_group)
-                if merged_transition:
-                    merged.append(merged_transition)
-                current_group = [transition]
-        
-        # Don't forget the last group
-        if current_group:
-            merged_transition = self._merge_transition_group(current_group)
+        merged = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if end - start == 1:
+                merged.append(sorted_transitions[start])
+                continue
+            merged_transition = self._merge_transition_group(sorted_transitions[start:end])
             if merged_transition:
                 merged.append(merged_transition)
         
@@ -441,7 +642,9 @@ class BasePELTTransitionDetector(BaseCategoricalTransitionDetector):
             return group[0]
         
         # Use the transition with highest confidence as representative
-        representative = max(group, key=lambda t: t.confidence)
+        representative = self._materialize_transition(
+            max(group, key=attrgetter('confidence'))
+        )
         
         # Update metadata to indicate merging
         representative.metadata = representative.metadata or {}
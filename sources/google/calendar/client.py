@@ -11,10 +11,42 @@ class GoogleCalendarClient:
     
     BASE_URL = "https://www.googleapis.com/calendar/v3"
     
-    def __init__(self, access_token: str, token_refresher: Optional[Callable] = None):
+    def __init__(
+        self,
+        access_token: str,
+        token_refresher: Optional[Callable] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
         self.access_token = access_token
         self.token_refresher = token_refresher
         self._update_headers()
+        
+        # One HTTP client for every request so connections and TLS sessions
+        # are reused across pages; a caller-supplied client is not closed here
+        self._client = client
+        self._owns_client = client is None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=10)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the HTTP client if this instance created it."""
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+    
+    async def __aenter__(self) -> "GoogleCalendarClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
     
     def _update_headers(self):
         """Update authorization headers with current token."""
@@ -31,30 +63,30 @@ class GoogleCalendarClient:
         **kwargs
     ) -> httpx.Response:
         """Make an HTTP request with automatic token refresh on 401."""
-        async with httpx.AsyncClient() as client:
-            response = await client.request(method, url, headers=self.headers, **kwargs)
-            
-            # If we get a 401 and have a token refresher, try to refresh
-            if response.status_code == 401 and retry_on_401 and self.token_refresher:
-                try:
-                    # Call the token refresher
-                    new_access_token = await self.token_refresher()
+        client = self._get_client()
+        response = await client.request(method, url, headers=self.headers, **kwargs)
+        
+        # If we get a 401 and have a token refresher, try to refresh
+        if response.status_code == 401 and retry_on_401 and self.token_refresher:
+            try:
+                # Call the token refresher
+                new_access_token = await self.token_refresher()
+                
+                if new_access_token:
+                    # Update our token and headers
+                    self.access_token = new_access_token
+                    self._update_headers()
                     
-                    if new_access_token:
-                        # Update our token and headers
-                        self.access_token = new_access_token
-                        self._update_headers()
-                        
-                        # Retry the request once
-                        response = await client.request(method, url, headers=self.headers, **kwargs)
-                except Exception as e:
-                    # If refresh fails, return the original 401 response
-                    # Log the error but don't raise it
-                    import sys
-                    print(f"Token refresh failed: {str(e)}", file=sys.stderr)
-                    pass
-            
-            return response
+                    # Retry the request once
+                    response = await client.request(method, url, headers=self.headers, **kwargs)
+            except Exception as e:
+                # If refresh fails, return the original 401 response
+                # Log the error but don't raise it
+                import sys
+                print(f"Token refresh failed: {str(e)}", file=sys.stderr)
+                pass
+        
+        return response
     
     async def list_calendars(self) -> List[Dict[str, Any]]:
         """List all calendars accessible by the user."""
@@ -80,6 +112,9 @@ class GoogleCalendarClient:
         """
         List events from a calendar.
         
+        Paginating callers should build the query once with _build_base_params
+        and call _list_events_page per page instead.
+        
         Args:
             calendar_id: Calendar identifier (default: "primary")
             time_min: Lower bound for event's end time (ignored if sync_token provided)
@@ -97,6 +132,33 @@ class GoogleCalendarClient:
         Raises:
             HTTPStatusError: If sync token is invalid (410 Gone), caller should retry with full sync
         """
+        base_params = self._build_base_params(
+            time_min=time_min,
+            time_max=time_max,
+            sync_token=sync_token,
+            max_results=max_results,
+            single_events=single_events,
+            order_by=order_by,
+            show_deleted=show_deleted
+        )
+        return await self._list_events_page(calendar_id, base_params, page_token)
+    
+    def _build_base_params(
+        self,
+        time_min: Optional[datetime] = None,
+        time_max: Optional[datetime] = None,
+        sync_token: Optional[str] = None,
+        max_results: int = 250,
+        single_events: bool = True,
+        order_by: str = "startTime",
+        show_deleted: bool = False
+    ) -> str:
+        """
+        Build the URL-encoded events query, without pageToken.
+        
+        Arguments are the same as list_events. The result is reused for every
+        page of a listing.
+        """
         params = {
             "maxResults": min(max_results, 2500),
         }
@@ -128,13 +190,28 @@ class GoogleCalendarClient:
                     if time_max.tzinfo is not None:
                         time_max = time_max.replace(tzinfo=None)
                 params["timeMax"] = time_max.isoformat() + "Z"
-                
+        
+        return urlencode(params)
+    
+    async def _list_events_page(
+        self,
+        calendar_id: str,
+        base_params: str,
+        page_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page of events using a query from _build_base_params.
+        
+        Raises:
+            HTTPStatusError: If sync token is invalid (410 Gone), caller should retry with full sync
+        """
+        query = base_params
         if page_token:
-            params["pageToken"] = page_token
+            query = f"{base_params}&{urlencode({'pageToken': page_token})}"
         
         # Properly URL-encode calendar ID to handle special characters like #
         calendar_id_encoded = quote(calendar_id, safe='')
-        url = f"{self.BASE_URL}/calendars/{calendar_id_encoded}/events?{urlencode(params)}"
+        url = f"{self.BASE_URL}/calendars/{calendar_id_encoded}/events?{query}"
         
         response = await self._make_request("GET", url)
         response.raise_for_status()
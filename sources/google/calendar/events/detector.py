@@ -1,9 +1,87 @@
 """Google Calendar events transition detector using event boundaries."""
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-import json
-from sources.base.transitions.categorical import BaseCategoricalTransitionDetector, Transition
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+from operator import attrgetter
+
+import numpy as np
+import orjson
+
+from sources.base.transitions.categorical import BaseCategoricalTransitionDetector, Transition, _epoch_ns
+
+logger = logging.getLogger(__name__)
+
+# Confidence of every explicit event boundary
+_BOUNDARY_CONFIDENCE = 0.98
+
+# Offset of an all-day event's end (23:59:59) from its midnight start
+_END_OF_DAY = timedelta(hours=23, minutes=59, seconds=59)
+
+
+def _parse_time(value: str, tz_cache: Dict[Any, Any]) -> datetime:
+    """
+    Parse an ISO timestamp, sharing one tzinfo object per UTC offset.
+    
+    fromisoformat builds a new timezone for every non-UTC offset; a calendar
+    usually has one or two, so later events reuse the first instance.
+    """
+    parsed = datetime.fromisoformat(value)
+    tz = parsed.tzinfo
+    if tz is None:
+        return parsed
+    cached = tz_cache.setdefault(parsed.utcoffset(), tz)
+    return parsed if cached is tz else parsed.replace(tzinfo=cached)
+
+
+def _event_bounds(
+    signal: Dict[str, Any],
+    timing: Dict[str, Any],
+    is_all_day: bool,
+    tz_cache: Dict[Any, Any]
+) -> Tuple[datetime, datetime]:
+    """Start and end of a calendar event signal."""
+    # Get start and end times for the event (fromisoformat accepts a
+    # trailing 'Z' on Python 3.11+)
+    timing_start = timing.get('start')
+    if timing_start:
+        event_start = _parse_time(timing_start, tz_cache)
+    else:
+        event_start = _parse_time(signal['timestamp'], tz_cache)
+    
+    # Calculate end time for the event
+    timing_end = timing.get('end')
+    duration_minutes = timing.get('duration_minutes')
+    if timing_end:
+        event_end = _parse_time(timing_end, tz_cache)
+    elif duration_minutes:
+        event_end = event_start + timedelta(minutes=duration_minutes)
+    elif is_all_day:
+        # All-day events end at 23:59:59
+        event_end = event_start.replace(hour=0, minute=0, second=0, microsecond=0) + _END_OF_DAY
+    else:
+        # Default to 1 hour duration
+        event_end = event_start + timedelta(hours=1)
+    
+    return event_start, event_end
+
+
+def _utc_sort_key(transition: Transition) -> int:
+    """Epoch-ns sort key that reads naive transition times as UTC."""
+    trans_time = transition.transition_time
+    if trans_time.tzinfo is not None:
+        return transition._ts_ns
+    return _epoch_ns(trans_time.replace(tzinfo=timezone.utc))
+
+
+def _load_metadata(metadata: Any) -> Dict[str, Any]:
+    """Return source_metadata as a dict, parsing JSON text columns."""
+    if isinstance(metadata, str):
+        try:
+            return orjson.loads(metadata)
+        except ValueError:
+            return {}
+    return metadata or {}
 
 
 class CalendarEventsTransitionDetector(BaseCategoricalTransitionDetector):
@@ -53,49 +131,55 @@ class CalendarEventsTransitionDetector(BaseCategoricalTransitionDetector):
         if not signals:
             return []
         
-        print(f"[CalendarEventsDetector] Processing {len(signals)} signals")
-        print(f"[CalendarEventsDetector] Time window: {start_time} to {end_time}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Processing %d signals", len(signals))
+            logger.debug("Time window: %s to %s", start_time, end_time)
         
         transitions = []
         
+        # Parse every signal's metadata in one pass up front
+        metadatas = [_load_metadata(signal.get('source_metadata')) for signal in signals]
+        
+        # Whether every boundary time is timezone-aware, which lets the
+        # window filter compare cached epoch nanoseconds directly
+        all_aware = True
+        tz_cache = {}
+        
         # Process each signal as a calendar event
-        for idx, signal in enumerate(signals):
-            # Parse metadata to get event timing
-            metadata = signal.get('source_metadata', {})
-            if isinstance(metadata, str):
-                try:
-                    metadata = json.loads(metadata)
-                except:
-                    metadata = {}
-            
+        for idx, (signal, metadata) in enumerate(zip(signals, metadatas)):
             # Get event timing information
             timing = metadata.get('timing', {})
             event_info = metadata.get('event', {})
             
-            # Get start and end times for the event
-            if timing.get('start'):
-                event_start = datetime.fromisoformat(timing['start'].replace('Z', '+00:00'))
-            else:
-                event_start = datetime.fromisoformat(signal['timestamp'].replace('Z', '+00:00'))
+            # Look up each field once; they feed both transitions
+            duration_minutes = timing.get('duration_minutes')
+            is_all_day = event_info.get('is_all_day', False)
+            idempotency_key = signal.get('idempotency_key')
             
-            # Calculate end time for the event
-            if timing.get('end'):
-                event_end = datetime.fromisoformat(timing['end'].replace('Z', '+00:00'))
-            elif timing.get('duration_minutes'):
-                event_end = event_start + timedelta(minutes=timing['duration_minutes'])
-            elif event_info.get('is_all_day'):
-                # All-day events end at 23:59:59
-                event_end = event_start.replace(hour=23, minute=59, second=59)
-            else:
-                # Default to 1 hour duration
-                event_end = event_start + timedelta(hours=1)
+            event_start, event_end = _event_bounds(signal, timing, is_all_day, tz_cache)
+            
+            all_aware = all_aware and event_start.tzinfo is not None and event_end.tzinfo is not None
             
             # Get event title and ID
             title = signal.get('signal_value', 'Unknown Event')
-            event_id = event_info.get('id') or signal.get('idempotency_key') or f"event_{signal.get('id', 'unknown')}"
+            event_id = event_info.get('id') or idempotency_key or f"event_{signal.get('id', 'unknown')}"
             
-            print(f"[CalendarEventsDetector] Event {idx+1}/{len(signals)}: {title}")
-            print(f"  Start: {event_start}, End: {event_end}")
+            if debug:
+                logger.debug(
+                    "Event %d/%d: %s (start %s, end %s)",
+                    idx + 1, len(signals), title, event_start, event_end
+                )
+            
+            # Metadata shared by the event's start and end transitions
+            event_metadata = {
+                'event_id': event_id,
+                'event_title': title,
+                'location': event_info.get('location'),
+                'is_all_day': is_all_day,
+                'duration_minutes': duration_minutes,
+                'idempotency_key': idempotency_key
+            }
             
             # Create start transition
             start_transition = Transition(
@@ -107,17 +191,9 @@ class CalendarEventsTransitionDetector(BaseCategoricalTransitionDetector):
                 before_std=0.0,
                 after_mean=1.0,   # Event active
                 after_std=0.0,
-                confidence=0.98,  # High confidence for explicit boundaries
+                confidence=_BOUNDARY_CONFIDENCE,  # High confidence for explicit boundaries
                 detection_method='event_boundary',
-                metadata={
-                    'event_id': event_id,
-                    'event_title': title,
-                    'event_type': 'calendar_start',
-                    'location': event_info.get('location'),
-                    'is_all_day': event_info.get('is_all_day', False),
-                    'duration_minutes': timing.get('duration_minutes'),
-                    'idempotency_key': signal.get('idempotency_key')
-                }
+                metadata={**event_metadata, 'event_type': 'calendar_start'}
             )
             transitions.append(start_transition)
             
@@ -131,51 +207,81 @@ class CalendarEventsTransitionDetector(BaseCategoricalTransitionDetector):
                 before_std=0.0,
                 after_mean=0.0,   # No event after
                 after_std=0.0,
-                confidence=0.98,  # High confidence for explicit boundaries
+                confidence=_BOUNDARY_CONFIDENCE,  # High confidence for explicit boundaries
                 detection_method='event_boundary',
-                metadata={
-                    'event_id': event_id,
-                    'event_title': title,
-                    'event_type': 'calendar_end',
-                    'location': event_info.get('location'),
-                    'is_all_day': event_info.get('is_all_day', False),
-                    'duration_minutes': timing.get('duration_minutes'),
-                    'idempotency_key': signal.get('idempotency_key')
-                }
+                metadata={**event_metadata, 'event_type': 'calendar_end'}
             )
             transitions.append(end_transition)
         
-        # Sort transitions by time
-        transitions.sort(key=lambda t: t.transition_time)
+        if debug:
+            logger.debug("Created %d transitions before filtering", len(transitions))
         
-        print(f"[CalendarEventsDetector] Created {len(transitions)} transitions before filtering")
+        min_confidence = self.min_confidence
+        # (transition, in_window) pairs, collected only for debug logging
+        dropped_transitions = []
         
-        # Filter by minimum confidence and time window
-        # Ensure timezone compatibility for comparison
-        filtered_transitions = []
-        for t in transitions:
-            # Make transition time timezone-naive if needed for comparison
-            trans_time = t.transition_time
-            if trans_time.tzinfo is not None and start_time.tzinfo is None:
+        if all_aware and start_time.tzinfo is not None and end_time.tzinfo is not None:
+            # Aware times on both sides compare as instants: sort on the
+            # cached epoch-ns values, binary-search the window's edges, and
+            # check confidence only inside it
+            ts = np.fromiter((t._ts_ns for t in transitions), dtype=np.int64, count=len(transitions))
+            order = np.argsort(ts, kind='stable')
+            ts = ts[order]
+            lo = int(np.searchsorted(ts, _epoch_ns(start_time), side='left'))
+            hi = int(np.searchsorted(ts, _epoch_ns(end_time), side='right'))
+            window = order[lo:hi].tolist()
+            filtered_transitions = [
+                t for t in (transitions[i] for i in window)
+                if t.confidence >= min_confidence
+            ]
+            if debug:
+                in_window = set(window)
+                dropped_transitions = [
+                    (t, i in in_window) for i, t in enumerate(transitions)
+                    if i not in in_window or t.confidence < min_confidence
+                ]
+        else:
+            # Filter by minimum confidence and time window, before sorting so
+            # only the kept transitions are sorted
+            # Ensure timezone compatibility for comparison: match transition
+            # times to the window's awareness, decided once for the whole pass
+            if start_time.tzinfo is None:
                 # Convert to naive datetime in UTC
-                trans_time = trans_time.replace(tzinfo=None)
-            elif trans_time.tzinfo is None and start_time.tzinfo is not None:
+                def normalize(trans_time: datetime) -> datetime:
+                    return trans_time.replace(tzinfo=None) if trans_time.tzinfo is not None else trans_time
+            else:
                 # Make transition time aware
-                import pytz
-                trans_time = pytz.UTC.localize(trans_time)
+                def normalize(trans_time: datetime) -> datetime:
+                    return trans_time.replace(tzinfo=timezone.utc) if trans_time.tzinfo is None else trans_time
             
-            if t.confidence >= self.min_confidence and start_time <= trans_time <= end_time:
-                filtered_transitions.append(t)
-        
-        print(f"[CalendarEventsDetector] {len(filtered_transitions)} transitions after filtering")
-        print(f"  Min confidence: {self.min_confidence}")
-        
-        # Debug: Show which transitions were filtered out
-        if len(filtered_transitions) < len(transitions):
-            filtered_out = len(transitions) - len(filtered_transitions)
-            print(f"[CalendarEventsDetector] Filtered out {filtered_out} transitions:")
+            filtered_transitions = []
             for t in transitions:
-                if t not in filtered_transitions:
-                    print(f"    - {t.transition_time}: confidence={t.confidence}, in_window={start_time <= t.transition_time <= end_time}")
+                trans_time = normalize(t.transition_time)
+                if t.confidence >= min_confidence and start_time <= trans_time <= end_time:
+                    filtered_transitions.append(t)
+                elif debug:
+                    dropped_transitions.append((t, start_time <= trans_time <= end_time))
+            
+            # Sort transitions by time, on the cached epoch-ns key. Naive
+            # times are keyed as UTC, matching the window comparison above,
+            # rather than by _ts_ns's local-time reading
+            if all_aware:
+                filtered_transitions.sort(key=attrgetter('_ts_ns'))
+            else:
+                filtered_transitions.sort(key=_utc_sort_key)
+        
+        if debug:
+            logger.debug(
+                "%d transitions after filtering (min confidence %s)",
+                len(filtered_transitions), self.min_confidence
+            )
+            # Show which transitions were filtered out
+            if dropped_transitions:
+                logger.debug("Filtered out %d transitions:", len(dropped_transitions))
+                for t, in_window in dropped_transitions:
+                    logger.debug(
+                        "    - %s: confidence=%s, in_window=%s",
+                        t.transition_time, t.confidence, in_window
+                    )
         
         return filtered_transitions
\ No newline at end of file
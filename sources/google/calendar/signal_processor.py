@@ -1,8 +1,7 @@
 """Signal processor for Google Calendar events - queues transition detection."""
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import Dict, Any, Optional
-from celery import signature
 
 
 class SignalProcessor:
@@ -38,9 +37,12 @@ class SignalProcessor:
         Returns:
             Task ID if queued successfully, None otherwise
         """
+        # Imported here so empty windows never pay for loading celery
+        from celery import signature
+        
         try:
-            # Format date for the task
-            date = start_time.strftime('%Y-%m-%d')
+            # Format date for the task (no strftime/locale machinery)
+            date = f"{start_time.year:04d}-{start_time.month:02d}-{start_time.day:02d}"
             
             # Queue single signal transition detection
             transition_task = signature(
@@ -96,9 +98,9 @@ class SignalProcessor:
             end_time = datetime.fromisoformat(metadata['end_time'])
         else:
             # Default to today if no time range specified
-            now = datetime.now()
-            start_time = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_time = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+            today = date.today()
+            start_time = datetime.combine(today, time.min)
+            end_time = datetime.combine(today, time.max)
         
         # Queue transition detection
         # TODO: Get timezone from database or use default
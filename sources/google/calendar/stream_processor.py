@@ -1,15 +1,41 @@
 """Generic configuration-driven stream processor for Google Calendar."""
 
-from datetime import datetime, timezone as tz
+from datetime import datetime
 from typing import Dict, Any, List, Optional
-from uuid import uuid4
-import json
+import logging
 from pathlib import Path
+import orjson
 from sqlalchemy import text
-from sources.base.processing.dedup import generate_idempotency_key
+from sources.base.processing.dedup import (
+    generate_idempotency_key,
+    should_deduplicate_by_timestamp_only,
+)
 from sources.base.processing.normalization import DataNormalizer
 from sources.base.processing.validation import DataValidator
 
+logger = logging.getLogger(__name__)
+
+
+# Rows per executemany round trip; keeps parameter payloads bounded for
+# large syncs while still collapsing hundreds of statements into one call
+INSERT_BATCH_SIZE = 500
+
+_INSERT_SIGNAL_SQL = text("""
+    INSERT INTO signals
+    (id, signal_id, source_name, timestamp,
+     confidence, signal_name, signal_value, idempotency_key,
+     source_metadata, created_at, updated_at)
+    VALUES (gen_random_uuid(), :signal_id, :source_name, :timestamp,
+            :confidence, :signal_name, :signal_value, :idempotency_key,
+            :source_metadata, :created_at, :updated_at)
+    ON CONFLICT (source_name, idempotency_key, signal_name) DO UPDATE SET
+        timestamp = EXCLUDED.timestamp,
+        signal_value = EXCLUDED.signal_value,
+        confidence = EXCLUDED.confidence,
+        source_metadata = EXCLUDED.source_metadata,
+        updated_at = EXCLUDED.updated_at
+""")
+
 
 class StreamProcessor:
     """
@@ -106,84 +132,103 @@ class StreamProcessor:
         # Track signals created per signal type
         signals_created = {}
         
-        # Process for each signal configured in the database
-        for signal_name, signal_id in signal_configs.items():
-            count = 0
+        # Loop invariants: one timestamp per batch and bound locals for
+        # the attributes/functions touched on every event
+        now = datetime.utcnow()
+        source_name = self.source_name
+        dedup_strategy = self.dedup_strategy
+        gen_key = generate_idempotency_key
+        # Timestamp-only keys never read the event content, so skip
+        # assembling it for every event
+        timestamp_only_keys = should_deduplicate_by_timestamp_only(dedup_strategy)
+        
+        # Per-signal accumulators, keyed in signal_configs order
+        rows_by_signal = {signal_name: [] for signal_name in signal_configs}
+        counts = dict.fromkeys(signal_configs, 0)
+        skipped = dict.fromkeys(signal_configs, 0)
+        
+        logger.debug("Processing %d events for %d signals", len(events), len(signal_configs))
+        
+        # Events are the outer loop so parsing, dedup keys and metadata
+        # serialization happen once per event rather than once per signal
+        for event_wrapper in events:
+            # Extract calendar and event info (Google Calendar specific structure)
+            # This could be made more generic with field mapping in config
+            calendar_info = event_wrapper.get('calendar', {})
+            event = event_wrapper.get('event', {})
+            
+            # Apply any filtering rules
+            accepted = []
+            for signal_name, signal_id in signal_configs.items():
+                if self._should_process_event(event, signal_name):
+                    accepted.append((signal_name, signal_id))
+                else:
+                    logger.debug(
+                        "Skipping event %s - failed should_process check",
+                        event.get('id', 'unknown')
+                    )
+                    skipped[signal_name] += 1
             
-            # Process each event for this signal
-            print(f"Processing {len(events)} events for signal {signal_name}")
-            for event_wrapper in events:
-                # Extract calendar and event info (Google Calendar specific structure)
-                # This could be made more generic with field mapping in config
-                calendar_info = event_wrapper.get('calendar', {})
-                event = event_wrapper.get('event', {})
-                
-                # Apply any filtering rules
-                if not self._should_process_event(event, signal_name):
-                    print(f"Skipping event {event.get('id', 'unknown')} - failed should_process check")
-                    continue
-                
-                # Parse timestamps
-                start_time = self._parse_event_time(event.get('start'))
-                end_time = self._parse_event_time(event.get('end'))
-                
-                if not start_time or not end_time:
-                    continue
-                
-                # Extract signal value
-                signal_value = self._extract_signal_value(event, signal_name)
-                
-                # Generate source event ID using configured fields
-                event_data = self._build_event_data(event, calendar_info)
-                idempotency_key = generate_idempotency_key(
-                    self.dedup_strategy, 
-                    start_time, 
-                    event_data
-                )
-                
-                # Build metadata
-                metadata = self._build_metadata(event, calendar_info, start_time, end_time)
-                
-                # Calculate confidence
-                confidence = self._calculate_confidence(event, signal_name)
-                
-                # Insert signal
-                db.execute(
-                    text("""
-                        INSERT INTO signals
-                        (id, signal_id, source_name, timestamp,
-                         confidence, signal_name, signal_value, idempotency_key,
-                         source_metadata, created_at, updated_at)
-                        VALUES (:id, :signal_id, :source_name, :timestamp,
-                                :confidence, :signal_name, :signal_value, :idempotency_key,
-                                :source_metadata, :created_at, :updated_at)
-                        ON CONFLICT (source_name, idempotency_key, signal_name) DO UPDATE SET
-                            timestamp = EXCLUDED.timestamp,
-                            signal_value = EXCLUDED.signal_value,
-                            confidence = EXCLUDED.confidence,
-                            source_metadata = EXCLUDED.source_metadata,
-                            updated_at = EXCLUDED.updated_at
-                    """),
-                    {
-                        "id": str(uuid4()),
-                        "signal_id": signal_id,
-                        "source_name": self.source_name,
-                        "timestamp": start_time,
-                        "confidence": confidence,
-                        "signal_name": signal_name,
-                        "signal_value": signal_value,
-                        "idempotency_key": idempotency_key,
-                        "source_metadata": json.dumps(metadata),
-                        "created_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
-                    }
-                )
-                count += 1
-                if count % 50 == 0:
-                    print(f"Inserted {count} signals so far for {signal_name}")
+            if not accepted:
+                continue
             
-            print(f"Total signals created for {signal_name}: {count}")
-            signals_created[signal_name] = count
+            # Parse timestamps
+            start_time = self._parse_event_time(event.get('start'))
+            end_time = self._parse_event_time(event.get('end'))
+            
+            if not start_time or not end_time:
+                for signal_name, _ in accepted:
+                    skipped[signal_name] += 1
+                continue
+            
+            # Generate source event ID using configured fields
+            event_data = (
+                {} if timestamp_only_keys
+                else self._build_event_data(event, calendar_info)
+            )
+            idempotency_key = gen_key(
+                dedup_strategy, 
+                start_time, 
+                event_data
+            )
+            
+            # Build metadata
+            # orjson's UTF-8 output decodes straight into the TEXT/JSON bind
+            metadata_json = orjson.dumps(
+                self._build_metadata(event, calendar_info, start_time, end_time)
+            ).decode('utf-8')
+            
+            for signal_name, signal_id in accepted:
+                rows = rows_by_signal[signal_name]
+                rows.append({
+                    "signal_id": signal_id,
+                    "source_name": source_name,
+                    "timestamp": start_time,
+                    "confidence": self._calculate_confidence(event, signal_name),
+                    "signal_name": signal_name,
+                    "signal_value": self._extract_signal_value(event, signal_name),
+                    "idempotency_key": idempotency_key,
+                    "source_metadata": metadata_json,
+                    "created_at": now,
+                    "updated_at": now
+                })
+                if len(rows) >= INSERT_BATCH_SIZE:
+                    counts[signal_name] += self._insert_signals(db, rows)
+                    rows.clear()
+                    logger.debug(
+                        "Inserted %d signals so far for %s",
+                        counts[signal_name], signal_name
+                    )
+        
+        for signal_name, rows in rows_by_signal.items():
+            if rows:
+                counts[signal_name] += self._insert_signals(db, rows)
+            
+            logger.info(
+                "signal=%s processed=%d created=%d skipped=%d",
+                signal_name, len(events), counts[signal_name], skipped[signal_name]
+            )
+            signals_created[signal_name] = counts[signal_name]
         
         # Commit all signals
         db.commit()
@@ -197,6 +242,14 @@ class StreamProcessor:
             "sync_metadata": sync_metadata
         }
     
+    def _insert_signals(self, db, rows: List[Dict[str, Any]]) -> int:
+        """Upsert a batch of signal rows with a single executemany call."""
+        db.execute(
+            _INSERT_SIGNAL_SQL,
+            rows
+        )
+        return len(rows)
+    
     def _should_process_event(self, event: Dict[str, Any], signal_name: str) -> bool:
         """
         Determine if an event should be processed based on signal configuration.
@@ -204,12 +257,12 @@ class StreamProcessor:
         # Skip declined or cancelled events
         status = event.get('status', 'confirmed')
         if status in ['declined', 'cancelled']:
-            print(f"  Skipping due to status: {status}")
+            logger.debug("Skipping event %s due to status: %s", event.get('id'), status)
             return False
         
         # Require event ID
         if not event.get('id'):
-            print(f"  Skipping - no event ID")
+            logger.debug("Skipping event - no event ID")
             return False
         
         # Could add more filtering based on signal_config metadata
@@ -341,15 +394,19 @@ class StreamProcessor:
         
         # Handle dateTime format (with time)
         if 'dateTime' in time_obj:
-            # Use DataNormalizer for consistent timestamp parsing
-            return DataNormalizer.normalize_timestamp(time_obj['dateTime'])
+            value = time_obj['dateTime']
+            # Google always sends RFC 3339 (offset or Z), which
+            # fromisoformat parses directly on 3.11+
+            if 'T' in value:
+                return datetime.fromisoformat(value)
+            # Use DataNormalizer for anything unusual
+            return DataNormalizer.normalize_timestamp(value)
         
         # Handle date format (all-day events)
         elif 'date' in time_obj:
-            # Parse date and set to midnight UTC
-            date_str = time_obj['date']
-            dt = datetime.strptime(date_str, '%Y-%m-%d')
-            return dt.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=tz.utc).replace(tzinfo=None)
+            # Fixed-width YYYY-MM-DD; midnight, naive as before
+            s = time_obj['date']
+            return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]))
         
         return None
     
@@ -47,8 +47,10 @@ class GoogleCalendarSync(BaseSync):
         Fetch data for the given date range.
         If dates are None, uses sync tokens for incremental sync.
         """
-        # This wraps the existing run() logic
-        return await self._run_sync(start_date, end_date)
+        # This wraps the existing run() logic; the client's connections are
+        # reused for the whole sync and closed when it finishes
+        async with self.client:
+            return await self._run_sync(start_date, end_date)
 
     async def _run_sync(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> Dict[str, Any]:
         """
@@ -89,6 +91,14 @@ class GoogleCalendarSync(BaseSync):
             # Store the new sync tokens we'll save at the end
             calendar_sync_tokens = {}  # Store new sync tokens per calendar
 
+            # Full sync without date filters to get sync token
+            # Note: Cannot use singleEvents or orderBy with sync tokens
+            full_sync_params = self.client._build_base_params(
+                single_events=False,  # MUST be False to get sync tokens
+                order_by="updated",  # Use 'updated' instead of 'startTime'
+                show_deleted=True  # Include deleted events
+            )
+
             for calendar in calendars:
                 calendar_id = calendar["id"]
                 
@@ -115,17 +125,20 @@ class GoogleCalendarSync(BaseSync):
                     print(f"No sync token found for calendar {calendar_id}, will do full sync")
                 fallback_to_time_sync = False
 
-                # Paginate through events
+                # Paginate through events; the query is encoded once per
+                # calendar and only pageToken changes between pages
+                token_params = (
+                    self.client._build_base_params(sync_token=use_sync_token)
+                    if use_sync_token else None
+                )
                 page_token = None
                 while True:
                     try:
                         if use_sync_token and not fallback_to_time_sync:
                             # Try sync token approach
                             try:
-                                result = await self.client.list_events(
-                                    calendar_id=calendar_id,
-                                    sync_token=use_sync_token,
-                                    page_token=page_token
+                                result = await self.client._list_events_page(
+                                    calendar_id, token_params, page_token
                                 )
                             except httpx.HTTPStatusError as e:
                                 if e.response.status_code == 410:
@@ -147,14 +160,8 @@ class GoogleCalendarSync(BaseSync):
                             # No sync token - do a full sync to get one
                             print(f"No sync token for calendar {calendar_id}, doing full sync to get token")
                             
-                            # Full sync without date filters to get sync token
-                            # Note: Cannot use singleEvents or orderBy with sync tokens
-                            result = await self.client.list_events(
-                                calendar_id=calendar_id,
-                                page_token=page_token,
-                                single_events=False,  # MUST be False to get sync tokens
-                                order_by="updated",  # Use 'updated' instead of 'startTime'
-                                show_deleted=True  # Include deleted events
+                            result = await self.client._list_events_page(
+                                calendar_id, full_sync_params, page_token
                             )
 
                         events = result.get("items", [])
@@ -16,6 +16,8 @@ class HeartRateVariabilityTransitionDetector(BasePELTTransitionDetector):
     metrics without semantic interpretation.
     """
     
+    uses_raw_signal_value = True
+    
     def __init__(
         self,
         min_confidence: float = 0.8,
@@ -48,9 +50,13 @@ class HeartRateVariabilityTransitionDetector(BasePELTTransitionDetector):
     def get_source_name(self) -> str:
         return "ios"
     
-    def extract_signal_values(self, signals: List[Dict[str, Any]]) -> List[float]:
+    def extract_signal_values(self, signals: List[Dict[str, Any]]) -> np.ndarray:
         """Extract HRV values from signals."""
-        return [float(signal['signal_value']) for signal in signals]
+        return np.fromiter(
+            (float(signal['signal_value']) for signal in signals),
+            dtype=np.float64,
+            count=len(signals)
+        )
     
     def get_cost_function(self) -> str:
         """Use L2 norm for HRV data."""
@@ -93,6 +93,17 @@ class WorkoutsTransitionDetector(BaseCategoricalTransitionDetector):
             if workout_end > end_time:
                 workout_end = end_time
             
+            # Confidence and metadata shared by the workout's start and end
+            confidence = self._calculate_confidence(signal, metadata)
+            workout_metadata = {
+                'event_type': 'workout',
+                'workout_type': workout_type,
+                'duration_minutes': duration_minutes,
+                'calories': metadata.get('calories'),
+                'distance_km': metadata.get('distance_km'),
+                'source_metadata': metadata
+            }
+            
             # Create workout start transition
             transitions.append(Transition(
                 transition_time=workout_start,
@@ -103,16 +114,9 @@ class WorkoutsTransitionDetector(BaseCategoricalTransitionDetector):
                 before_std=None,
                 after_mean=None,
                 after_std=None,
-                confidence=self._calculate_confidence(signal, metadata),
+                confidence=confidence,
                 detection_method='episodic_event',
-                metadata={
-                    'event_type': 'workout',
-                    'workout_type': workout_type,
-                    'duration_minutes': duration_minutes,
-                    'calories': metadata.get('calories'),
-                    'distance_km': metadata.get('distance_km'),
-                    'source_metadata': metadata
-                }
+                metadata=workout_metadata
             ))
             
             # Create workout end transition
@@ -125,16 +129,9 @@ class WorkoutsTransitionDetector(BaseCategoricalTransitionDetector):
                 before_std=None,
                 after_mean=None,
                 after_std=None,
-                confidence=self._calculate_confidence(signal, metadata),
+                confidence=confidence,
                 detection_method='episodic_event',
-                metadata={
-                    'event_type': 'workout',
-                    'workout_type': workout_type,
-                    'duration_minutes': duration_minutes,
-                    'calories': metadata.get('calories'),
-                    'distance_km': metadata.get('distance_km'),
-                    'source_metadata': metadata
-                }
+                metadata={**workout_metadata}  # own copy; merging marks end transitions
             ))
         
         # Merge overlapping workouts
@@ -1,8 +1,25 @@
 """Signal processor for iOS location signals - queues transition detection."""
 
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
-from celery import signature, group
+from typing import Dict, Any, Optional, List, Tuple
+
+
+def _window_args(start_time: datetime, end_time: datetime) -> Tuple[str, str, str]:
+    """Date, start and end task arguments for a detection window."""
+    # Date formatted without strftime/locale machinery
+    date = f"{start_time.year:04d}-{start_time.month:02d}-{start_time.day:02d}"
+    return date, start_time.isoformat(), end_time.isoformat()
+
+
+def _detection_signature(signal_name: str, window_args: Tuple[str, str, str], timezone: str):
+    """Signature for one single-signal transition detection task."""
+    from celery import signature
+    
+    return signature(
+        'run_single_signal_transition_detection',
+        args=[signal_name, *window_args, timezone],
+        queue='celery'
+    )
 
 
 class SignalProcessor:
@@ -42,30 +59,8 @@ class SignalProcessor:
         Returns:
             Task ID if queued successfully, None otherwise
         """
-        try:
-            # Format date for the task
-            date = start_time.strftime('%Y-%m-%d')
-            
-            # Queue single signal transition detection
-            transition_task = signature(
-                'run_single_signal_transition_detection',
-                args=[
-                    signal_name,
-                    date,
-                    start_time.isoformat(),
-                    end_time.isoformat(),
-                    timezone
-                ],
-                queue='celery'
-            )
-            
-            result = transition_task.apply_async()
-            print(f"[SignalProcessor] Queued transition detection for {signal_name}: {result.id}")
-            return result.id
-            
-        except Exception as e:
-            print(f"[SignalProcessor] Failed to queue transition detection for {signal_name}: {e}")
-            return None
+        task_ids = self.queue_batch([(signal_name, start_time, end_time)], timezone=timezone)
+        return task_ids[0] if task_ids else None
     
     def process_after_stream(
         self,
@@ -108,21 +103,76 @@ class SignalProcessor:
             end_time = datetime.now()
             start_time = end_time - timedelta(hours=1)
         
-        # Queue transition detection for each signal type that has data
-        for signal_name in self.signal_names:
-            # Only queue if this signal had data created
-            if signals_created.get(signal_name, 0) > 0:
-                task_id = self.queue_transition_detection(
-                    signal_name=signal_name,
-                    start_time=start_time,
-                    end_time=end_time
-                )
-                
-                if task_id:
-                    result['transition_detection_queued'][signal_name] = task_id
+        # Queue transition detection for each signal type that has data,
+        # in one group publish
+        windows = [
+            (signal_name, start_time, end_time)
+            for signal_name in self.signal_names
+            if signals_created.get(signal_name, 0) > 0
+        ]
+        task_ids = self.queue_batch(windows) if windows else None
+        
+        if task_ids:
+            result['transition_detection_queued'] = {
+                signal_name: task_id
+                for (signal_name, _, _), task_id in zip(windows, task_ids)
+                if task_id is not None
+            }
         
         return result
     
+    def queue_batch(
+        self,
+        windows: List[Tuple[str, datetime, datetime]],
+        timezone: str = "America/Chicago"
+    ) -> Optional[List[str]]:
+        """
+        Queue transition detection for several signal windows as one group.
+        
+        Args:
+            windows: (signal_name, start_time, end_time) per detection task
+            timezone: Timezone for detection
+            
+        Returns:
+            Task IDs in the order of windows (None for a signal that could
+            not be queued), or None if nothing was queued
+        """
+        # Imported here so empty windows never pay for loading celery
+        from celery import group
+        
+        # Windows usually share one time range; format each range once
+        window_args = {}
+        tasks = []
+        for signal_name, start_time, end_time in windows:
+            args = window_args.get((start_time, end_time))
+            if args is None:
+                args = window_args[(start_time, end_time)] = _window_args(start_time, end_time)
+            tasks.append(_detection_signature(signal_name, args, timezone))
+        
+        if len(tasks) > 1:
+            try:
+                # One group: the messages go out over a single producer
+                result = group(tasks).apply_async()
+                print(f"[SignalProcessor] Queued {len(tasks)} transition detection tasks as group {result.id}")
+                return [child.id for child in result.results]
+            except Exception as e:
+                print(f"[SignalProcessor] Failed to queue transition detection group, queuing per signal: {e}")
+        
+        # Single windows go out directly. A failed group publish is
+        # all-or-nothing, so queue each signal on its own rather than lose
+        # detection for every signal in the batch
+        task_ids = []
+        for (signal_name, _, _), task in zip(windows, tasks):
+            try:
+                task_id = task.apply_async().id
+                print(f"[SignalProcessor] Queued transition detection for {signal_name}: {task_id}")
+            except Exception as e:
+                print(f"[SignalProcessor] Failed to queue transition detection for {signal_name}: {e}")
+                task_id = None
+            task_ids.append(task_id)
+        
+        return task_ids if any(task_ids) else None
+    
     def queue_batch_transition_detection(
         self,
         start_time: datetime,
@@ -140,32 +190,7 @@ class SignalProcessor:
         Returns:
             List of task IDs if queued successfully
         """
-        try:
-            date = start_time.strftime('%Y-%m-%d')
-            
-            # Create a group of parallel tasks
-            tasks = []
-            for signal_name in self.signal_names:
-                task = signature(
-                    'run_single_signal_transition_detection',
-                    args=[
-                        signal_name,
-                        date,
-                        start_time.isoformat(),
-                        end_time.isoformat(),
-                        timezone
-                    ],
-                    queue='celery'
-                )
-                tasks.append(task)
-            
-            # Execute tasks in parallel
-            job = group(tasks)
-            result = job.apply_async()
-            
-            print(f"[SignalProcessor] Queued {len(tasks)} transition detection tasks in parallel")
-            return result.id
-            
-        except Exception as e:
-            print(f"[SignalProcessor] Failed to queue batch transition detection: {e}")
-            return None
\ No newline at end of file
+        return self.queue_batch(
+            [(signal_name, start_time, end_time) for signal_name in self.signal_names],
+            timezone=timezone
+        )
\ No newline at end of file
@@ -152,8 +152,8 @@ class StreamProcessor:
             original_chunk_id = chunk.get('id', str(uuid4()))
             
             # Parse timestamps
-            timestamp_start = datetime.fromisoformat(chunk['timestamp_start'].replace('Z', '+00:00'))
-            timestamp_end = datetime.fromisoformat(chunk['timestamp_end'].replace('Z', '+00:00'))
+            timestamp_start = datetime.fromisoformat(chunk['timestamp_start'])
+            timestamp_end = datetime.fromisoformat(chunk['timestamp_end'])
             
             if timestamp_start.tzinfo:
                 timestamp_start = timestamp_start.astimezone(tz.utc).replace(tzinfo=None)
@@ -17,6 +17,8 @@ class AppActivityTransitionDetector(BasePELTTransitionDetector):
     Uses PELT to find optimal change points where app usage behavior changes.
     """
     
+    uses_raw_signal_value = True
+    
     def __init__(
         self,
         min_confidence: float = 0.8,
@@ -54,9 +56,13 @@ class AppActivityTransitionDetector(BasePELTTransitionDetector):
     def get_source_name(self) -> str:
         return "mac"
     
-    def extract_signal_values(self, signals: List[Dict[str, Any]]) -> List[float]:
+    def extract_signal_values(self, signals: List[Dict[str, Any]]) -> np.ndarray:
         """Extract app focus duration values from signals."""
-        return [float(signal['signal_value']) for signal in signals]
+        return np.fromiter(
+            (float(signal['signal_value']) for signal in signals),
+            dtype=np.float64,
+            count=len(signals)
+        )
     
     def get_cost_function(self) -> str:
         """Use L2 norm for continuous focus duration data."""
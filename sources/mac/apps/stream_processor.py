@@ -68,7 +68,7 @@ class MacAppActivityStreamProcessor:
                     timestamp = datetime.fromtimestamp(timestamp_value, tz=tz.utc).replace(tzinfo=None)
             else:
                 # ISO string
-                timestamp = datetime.fromisoformat(timestamp_value.replace('Z', '+00:00'))
+                timestamp = datetime.fromisoformat(timestamp_value)
                 if timestamp.tzinfo:
                     timestamp = timestamp.astimezone(tz.utc).replace(tzinfo=None)
             
@@ -274,7 +274,7 @@ class NotionPagesStreamProcessor:
             return None
         
         try:
-            # Remove Z and add +00:00 for proper timezone handling
-            return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+            # fromisoformat handles the trailing Z on Python 3.11+
+            return datetime.fromisoformat(timestamp_str)
         except (ValueError, AttributeError):
             return None
\ No newline at end of file
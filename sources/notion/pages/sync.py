@@ -184,9 +184,7 @@ class NotionPagesSync(BaseSync):
             for page in pages:
                 last_edited_str = page.get("last_edited_time", "")
                 if last_edited_str:
-                    last_edited = datetime.fromisoformat(
-                        last_edited_str.replace("Z", "+00:00")
-                    )
+                    last_edited = datetime.fromisoformat(last_edited_str)
                     
                     if last_edited < since:
                         has_more = False
@@ -45,7 +45,7 @@ class StreamProcessor(BaseStreamProcessor):
         
         try:
             # Strava returns ISO format timestamps
-            timestamp = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
+            timestamp = datetime.fromisoformat(start_date_str)
         except:
             return []
         
@@ -0,0 +1,127 @@
+"""Check the calendar detector's window filter across aware and naive times."""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("orjson")
+
+from sources.google.calendar.events.detector import CalendarEventsTransitionDetector
+
+
+UTC = timezone.utc
+WINDOW = (datetime(2024, 6, 1, 10, 0), datetime(2024, 6, 1, 12, 0))
+
+# (event id, start, end) as naive UTC wall times, deliberately out of order.
+# e1 ends on the window start, e4 starts on the window end, and e2's end ties
+# with e3's start.
+EVENTS = [
+    ("e4", datetime(2024, 6, 1, 12, 0), datetime(2024, 6, 1, 13, 0)),
+    ("e2", datetime(2024, 6, 1, 10, 30), datetime(2024, 6, 1, 11, 0)),
+    ("e3", datetime(2024, 6, 1, 11, 0), datetime(2024, 6, 1, 11, 30)),
+    ("e1", datetime(2024, 6, 1, 9, 0), datetime(2024, 6, 1, 10, 0)),
+    ("e0", datetime(2024, 6, 1, 8, 0), datetime(2024, 6, 1, 9, 0)),
+]
+
+EXPECTED = [
+    ("e1", "calendar_end"),
+    ("e2", "calendar_start"),
+    ("e2", "calendar_end"),
+    ("e3", "calendar_start"),
+    ("e3", "calendar_end"),
+    ("e4", "calendar_start"),
+]
+
+
+def make_signal(event_id, start, end):
+    return {
+        "signal_value": event_id,
+        "idempotency_key": event_id,
+        "timestamp": start.isoformat(),
+        "source_metadata": {
+            "event": {"id": event_id},
+            "timing": {"start": start.isoformat(), "end": end.isoformat()},
+        },
+    }
+
+
+def make_signals(awareness):
+    """Signals for EVENTS; awareness(i) says whether event i carries +00:00."""
+    signals = []
+    for i, (event_id, start, end) in enumerate(EVENTS):
+        if awareness(i):
+            start, end = start.replace(tzinfo=UTC), end.replace(tzinfo=UTC)
+        signals.append(make_signal(event_id, start, end))
+    return signals
+
+
+def window(aware):
+    start, end = WINDOW
+    if aware:
+        return start.replace(tzinfo=UTC), end.replace(tzinfo=UTC)
+    return start, end
+
+
+def kept(signals, start, end):
+    transitions = CalendarEventsTransitionDetector().detect_transitions(signals, start, end)
+    return [(t.metadata["event_id"], t.metadata["event_type"]) for t in transitions]
+
+
+@pytest.fixture
+def local_tz(monkeypatch):
+    """Run with a non-UTC local zone, so naive times read as local would differ."""
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is unavailable")
+    monkeypatch.setenv("TZ", "America/Chicago")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+EVENT_AWARENESS = {
+    "aware": lambda i: True,
+    "naive": lambda i: False,
+    "mixed": lambda i: i % 2 == 0,
+}
+
+
+@pytest.mark.parametrize("events", sorted(EVENT_AWARENESS))
+@pytest.mark.parametrize("window_aware", [True, False], ids=["aware_window", "naive_window"])
+def test_kept_transitions_match_across_awareness(local_tz, events, window_aware):
+    signals = make_signals(EVENT_AWARENESS[events])
+
+    assert kept(signals, *window(window_aware)) == EXPECTED
+
+
+def test_array_and_loop_paths_agree():
+    # Offsets other than UTC compare as instants on both paths
+    signals = make_signals(EVENT_AWARENESS["aware"])
+    signals.append(make_signal(
+        "e5",
+        datetime.fromisoformat("2024-06-01T13:45:00+02:00"),
+        datetime.fromisoformat("2024-06-01T14:15:00+02:00"),
+    ))
+    start, end = window(True)
+
+    array_path = kept(signals, start, end)
+    # One naive event, well outside the window, sends the same data down
+    # the per-transition loop instead
+    loop_path = kept(
+        signals + [make_signal("outside", datetime(2024, 5, 1), datetime(2024, 5, 1, 1))],
+        start,
+        end,
+    )
+
+    assert array_path == loop_path
+    assert array_path == EXPECTED[:5] + [("e5", "calendar_start")] + EXPECTED[5:]
+
+
+def test_confidence_filter_applies_on_both_paths():
+    detector = CalendarEventsTransitionDetector(min_confidence=0.99)
+
+    for events in ("aware", "naive"):
+        signals = make_signals(EVENT_AWARENESS[events])
+        assert detector.detect_transitions(signals, *window(events == "aware")) == []
@@ -0,0 +1,156 @@
+"""Tests for the Google Calendar stream processor against a recording db double."""
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("orjson")
+
+from sources.google.calendar import stream_processor
+from sources.google.calendar.stream_processor import INSERT_BATCH_SIZE, StreamProcessor
+
+
+SIGNAL_CONFIGS = {
+    "google_calendar_events": "signal-events",
+    "google_calendar_busy": "signal-busy",
+}
+
+
+class RecordingDB:
+    """Records each executemany batch; the processor clears its lists after."""
+
+    def __init__(self):
+        self.batches = []
+        self.commits = 0
+
+    def execute(self, statement, rows):
+        assert statement is stream_processor._INSERT_SIGNAL_SQL
+        self.batches.append([dict(row) for row in rows])
+
+    def commit(self):
+        self.commits += 1
+
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+def make_event(i, **overrides):
+    event = {
+        "id": f"event-{i}",
+        "summary": f"Meeting {i}",
+        "status": "confirmed",
+        "start": {"dateTime": f"2024-06-01T{i // 60 % 24:02d}:{i % 60:02d}:00+00:00"},
+        "end": {"dateTime": f"2024-06-01T{i // 60 % 24:02d}:{i % 60:02d}:30+00:00"},
+    }
+    event.update(overrides)
+    return {"calendar": {"id": "primary", "summary": "Work"}, "event": event}
+
+
+def run(events, signal_configs=SIGNAL_CONFIGS, processor=None):
+    processor = processor or StreamProcessor("google_calendar")
+    db = RecordingDB()
+    result = processor.process({"events": events}, signal_configs, db)
+    return result, db
+
+
+def test_one_row_per_accepted_signal_per_event():
+    events = [make_event(i) for i in range(3)]
+
+    result, db = run(events)
+
+    rows = db.rows()
+    assert len(rows) == 6
+    assert result["signals_created"] == {
+        "google_calendar_events": 3,
+        "google_calendar_busy": 3,
+    }
+    assert result["total_signals"] == 6
+    assert result["records_processed"] == 3
+    assert db.commits == 1
+    for signal_name, signal_id in SIGNAL_CONFIGS.items():
+        signal_rows = [row for row in rows if row["signal_name"] == signal_name]
+        assert [row["signal_value"] for row in signal_rows] == [
+            "Meeting 0", "Meeting 1", "Meeting 2"
+        ]
+        assert all(row["signal_id"] == signal_id for row in signal_rows)
+    # Both signals share the event's key and serialized metadata
+    by_key = {}
+    for row in rows:
+        by_key.setdefault(row["idempotency_key"], []).append(row)
+    assert len(by_key) == 3
+    for pair in by_key.values():
+        assert len(pair) == 2
+        assert pair[0]["source_metadata"] == pair[1]["source_metadata"]
+
+
+def test_flushes_at_insert_batch_size():
+    events = [make_event(i) for i in range(INSERT_BATCH_SIZE + 7)]
+
+    result, db = run(events, {"google_calendar_events": "signal-events"})
+
+    assert [len(batch) for batch in db.batches] == [INSERT_BATCH_SIZE, 7]
+    assert result["signals_created"] == {"google_calendar_events": INSERT_BATCH_SIZE + 7}
+
+
+def test_flushes_each_signal_separately():
+    events = [make_event(i) for i in range(INSERT_BATCH_SIZE + 1)]
+
+    result, db = run(events)
+
+    assert [len(batch) for batch in db.batches] == [
+        INSERT_BATCH_SIZE, INSERT_BATCH_SIZE, 1, 1
+    ]
+    for batch in db.batches:
+        assert len({row["signal_name"] for row in batch}) == 1
+    assert result["total_signals"] == 2 * (INSERT_BATCH_SIZE + 1)
+
+
+def test_skipped_events_count_against_every_signal():
+    events = [
+        make_event(0),
+        make_event(1, status="cancelled"),
+        make_event(2, id=None),
+        make_event(3, start={}),
+    ]
+
+    result, db = run(events)
+
+    assert result["signals_created"] == {
+        "google_calendar_events": 1,
+        "google_calendar_busy": 1,
+    }
+    assert len(db.rows()) == 2
+    assert {row["signal_value"] for row in db.rows()} == {"Meeting 0"}
+
+
+def test_skipped_counts_are_per_signal(monkeypatch, caplog):
+    processor = StreamProcessor("google_calendar")
+
+    def should_process(event, signal_name):
+        # The busy signal only takes odd events
+        return signal_name != "google_calendar_busy" or event["id"] in ("event-1", "event-3")
+
+    monkeypatch.setattr(processor, "_should_process_event", should_process)
+    events = [make_event(i) for i in range(4)]
+
+    with caplog.at_level("INFO", logger=stream_processor.__name__):
+        result, db = run(events, processor=processor)
+
+    assert result["signals_created"] == {
+        "google_calendar_events": 4,
+        "google_calendar_busy": 2,
+    }
+    busy = [row for row in db.rows() if row["signal_name"] == "google_calendar_busy"]
+    assert [row["signal_value"] for row in busy] == ["Meeting 1", "Meeting 3"]
+    assert "signal=google_calendar_events processed=4 created=4 skipped=0" in caplog.text
+    assert "signal=google_calendar_busy processed=4 created=2 skipped=2" in caplog.text
+
+
+def test_empty_stream_inserts_nothing():
+    result, db = run([])
+
+    assert db.batches == []
+    assert result["signals_created"] == {
+        "google_calendar_events": 0,
+        "google_calendar_busy": 0,
+    }
+    assert db.commits == 1
@@ -0,0 +1,116 @@
+"""Tests for MinIOClient listing and cleanup against an in-memory S3 double."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("aioboto3")
+
+from sources.base.storage.minio import DELETE_BATCH_SIZE, MinIOClient
+
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+class FakePaginator:
+    """list_objects_v2 paginator over a sorted key -> metadata mapping."""
+
+    def __init__(self, objects):
+        self.objects = objects
+
+    async def paginate(self, Bucket, Prefix, PaginationConfig):
+        page_size = PaginationConfig.get("PageSize", 1000)
+        max_items = PaginationConfig.get("MaxItems")
+        keys = [key for key in sorted(self.objects) if key.startswith(Prefix)]
+        if max_items is not None:
+            keys = keys[:max_items]
+        for i in range(0, len(keys), page_size):
+            yield {"Contents": [self.objects[key] for key in keys[i:i + page_size]]}
+
+
+class FakeS3:
+    """Just enough of an aioboto3 S3 client for listing and bulk deletes."""
+
+    def __init__(self):
+        self.objects = {}
+        self.delete_calls = []
+
+    def add(self, key, last_modified):
+        self.objects[key] = {"Key": key, "LastModified": last_modified, "Size": 1}
+
+    def get_paginator(self, name):
+        assert name == "list_objects_v2"
+        return FakePaginator(self.objects)
+
+    async def delete_objects(self, Bucket, Delete):
+        batch = Delete["Objects"]
+        assert len(batch) <= DELETE_BATCH_SIZE
+        self.delete_calls.append(len(batch))
+        for obj in batch:
+            self.objects.pop(obj["Key"], None)
+        return {}
+
+
+def make_client(s3):
+    client = MinIOClient()
+
+    async def get_client():
+        return s3
+
+    client._get_client = get_client
+    return client
+
+
+def add_day(s3, connection_id, day, count, age_days):
+    for i in range(count):
+        key = f"google/{day:%Y/%m/%d}/{connection_id}/{i:05d}.json"
+        s3.add(key, NOW - timedelta(days=age_days))
+
+
+def test_open_ended_listing_ignores_other_connections_for_max_keys():
+    s3 = FakeS3()
+    day = NOW - timedelta(days=3)
+    # 'aaa' sorts first, so its keys fill the first listing page
+    add_day(s3, "aaa", day, 1500, age_days=3)
+    add_day(s3, "zzz", day, 20, age_days=3)
+    client = make_client(s3)
+
+    objects = asyncio.run(client.list_source_files("google", "zzz", until=NOW))
+
+    assert len(objects) == 20
+    assert all(obj["Key"].split("/")[4] == "zzz" for obj in objects)
+
+
+def test_open_ended_listing_stops_at_max_keys():
+    s3 = FakeS3()
+    add_day(s3, "conn", NOW - timedelta(days=3), 50, age_days=3)
+    client = make_client(s3)
+
+    objects = asyncio.run(
+        client.list_source_files("google", "conn", until=NOW, max_keys=10)
+    )
+
+    assert len(objects) == 10
+
+
+def test_delete_old_data_removes_more_than_one_batch():
+    s3 = FakeS3()
+    for age in range(30, 33):
+        day = NOW - timedelta(days=age)
+        add_day(s3, "conn", day, 900, age_days=age)
+        add_day(s3, "other", day, 400, age_days=age)
+    # Recent files for the same connection must survive
+    add_day(s3, "conn", NOW, 25, age_days=0)
+    client = make_client(s3)
+
+    deleted = asyncio.run(
+        client.delete_old_data("google", "conn", older_than=NOW - timedelta(days=7))
+    )
+
+    assert deleted == 2700
+    assert sum(s3.delete_calls) == 2700
+    assert len(s3.delete_calls) == 3
+    remaining = [key.split("/")[4] for key in s3.objects]
+    assert remaining.count("conn") == 25
+    assert remaining.count("other") == 1200
@@ -0,0 +1,92 @@
+"""Check the compiled PELT against ruptures' Pelt on random signals."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+rpt = pytest.importorskip("ruptures")
+pytest.importorskip("numba")
+
+from sources.base.transitions._pelt_numba import DEFAULT_JUMP, pelt_changepoints
+
+
+def penalized_cost(signal, breakpoints, cost_function, pen):
+    """Total segment cost plus pen per segment, as Pelt minimizes it."""
+    total = 0.0
+    start = 0
+    for end in breakpoints:
+        segment = signal[start:end]
+        if cost_function == "l2":
+            total += float(((segment - segment.mean()) ** 2).sum())
+        else:
+            total += float(np.abs(segment - np.median(segment)).sum())
+        total += pen
+        start = end
+    return total
+
+
+def random_signal(rng):
+    """Piecewise-constant signal with noise, some repeated values and outliers."""
+    n = int(rng.integers(20, 400))
+    n_segments = int(rng.integers(1, 6))
+    cuts = np.sort(rng.choice(np.arange(1, n), size=n_segments - 1, replace=False))
+    levels = rng.normal(0, 5, size=n_segments)
+    signal = np.repeat(levels, np.diff(np.concatenate(([0], cuts, [n]))))
+    signal = signal + rng.normal(0, rng.uniform(0.1, 2.0), size=n)
+    if rng.random() < 0.3:
+        # Quantized readings produce the ties the L1 median has to handle
+        signal = np.round(signal)
+    return signal
+
+
+@pytest.mark.parametrize("cost_function", ["l1", "l2"])
+def test_matches_ruptures_pelt(cost_function):
+    rng = np.random.default_rng(20240601)
+    differing = 0
+    for _ in range(300):
+        signal = random_signal(rng)
+        min_size = int(rng.integers(1, 10))
+        pen = float(rng.uniform(1.0, 50.0))
+
+        expected = rpt.Pelt(model=cost_function, min_size=min_size, jump=DEFAULT_JUMP)
+        expected = expected.fit(signal.reshape(-1, 1)).predict(pen=pen)
+        actual = pelt_changepoints(signal, cost_function, pen, min_size).tolist()
+
+        assert actual[-1] == len(signal)
+        if actual == expected:
+            continue
+        # Different breakpoints are only acceptable as equal-cost ties, or
+        # when the compiled search found a cheaper segmentation
+        differing += 1
+        actual_cost = penalized_cost(signal, actual, cost_function, pen)
+        expected_cost = penalized_cost(signal, expected, cost_function, pen)
+        assert actual_cost <= expected_cost + 1e-6 * max(1.0, abs(expected_cost))
+
+    assert differing <= 10
+
+
+@pytest.mark.parametrize("cost_function", ["l1", "l2"])
+def test_finds_clean_step(cost_function):
+    signal = np.concatenate((np.zeros(50), np.full(50, 10.0)))
+
+    assert pelt_changepoints(signal, cost_function, 5.0, 2).tolist() == [50, 100]
+
+
+@pytest.mark.parametrize("cost_function", ["l1", "l2"])
+def test_min_size_below_cost_minimum_matches_ruptures(cost_function):
+    rng = np.random.default_rng(7)
+    signal = rng.normal(0, 1, size=120)
+    signal[40:] += 6.0
+
+    expected = rpt.Pelt(model=cost_function, min_size=1, jump=1)
+    expected = expected.fit(signal.reshape(-1, 1)).predict(pen=3.0)
+    actual = pelt_changepoints(signal, cost_function, 3.0, 1, jump=1).tolist()
+
+    assert actual == expected
+    if cost_function == "l1":
+        # ruptures raises L1's min_size to 2, so no single-point segments
+        assert min(np.diff([0] + actual)) >= 2
+
+
+def test_rejects_unknown_cost_function():
+    with pytest.raises(ValueError):
+        pelt_changepoints(np.zeros(10), "rbf", 1.0, 2)
@@ -0,0 +1,243 @@
+"""Tests for the sync_stream task body against a recording AsyncSession double."""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("celery")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("asyncpg")
+pytest.importorskip("aioboto3")
+
+from sources.base.scheduler.tasks import sync_sources, token_refresh
+
+
+STREAM_ROW = {
+    "id": "stream-1",
+    "source_name": "google",
+    "stream_name": "google_calendar",
+    "status": "active",
+    "auth_type": None,
+    "stream_instance_id": "instance-1",
+    "sync_cursor": None,
+    "skip_reason": None,
+}
+
+
+class FakeResult:
+    def __init__(self, row=None, scalar=None):
+        self.row = row
+        self.scalar = scalar
+
+    def first(self):
+        return self.row
+
+    def scalar_one(self):
+        return self.scalar
+
+
+class FakeSession:
+    """Records statements and hands back canned rows for the lookups."""
+
+    def __init__(self, stream_row):
+        self.stream_row = stream_row
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.executed.append((statement, params))
+        if statement is sync_sources._SELECT_STREAM:
+            if self.stream_row is None:
+                return FakeResult()
+            return FakeResult(row=SimpleNamespace(_mapping=self.stream_row))
+        if statement is sync_sources._INSERT_STREAM_ACTIVITY:
+            return FakeResult(scalar="run-1")
+        if statement is sync_sources._SELECT_STREAM_OAUTH_SOURCE:
+            return FakeResult(row=SimpleNamespace(_mapping={
+                "id": "source-1",
+                "oauth_access_token": "old-access",
+                "oauth_refresh_token": "refresh-1",
+                "oauth_expires_at": None,
+                "scopes": None,
+            }))
+        return FakeResult()
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    def params_for(self, statement):
+        return [params for stmt, params in self.executed if stmt is statement]
+
+
+class RetryRequested(Exception):
+    pass
+
+
+class FakeTask:
+    max_retries = 3
+
+    def __init__(self, retries=0):
+        self.request = SimpleNamespace(retries=retries)
+        self.retry_countdown = None
+
+    def retry(self, countdown, exc):
+        self.retry_countdown = countdown
+        return RetryRequested(exc)
+
+
+def make_sync_class(run):
+    class FakeSync:
+        def __init__(self, stream, *args, **kwargs):
+            self.stream = stream
+
+        async def run(self):
+            return run()
+
+    return FakeSync
+
+
+@pytest.fixture
+def session(monkeypatch):
+    fake = FakeSession(dict(STREAM_ROW))
+    monkeypatch.setattr(sync_sources, "AsyncSessionLocal", lambda: fake)
+    return fake
+
+
+def use_sync(monkeypatch, run):
+    monkeypatch.setattr(
+        sync_sources.SourceRegistry,
+        "get_sync_class",
+        staticmethod(lambda stream_name, source_name: make_sync_class(run)),
+    )
+
+
+def test_sync_stream_success_records_completed_run(session, monkeypatch):
+    use_sync(monkeypatch, lambda: {"records_processed": 3, "next_sync_token": "tok"})
+
+    result = asyncio.run(sync_sources._sync_stream(FakeTask(), "stream-1", False))
+
+    assert result["status"] == "success"
+    assert result["stats"]["records_processed"] == 3
+    [cursor] = session.params_for(sync_sources._UPDATE_STREAM_CURSOR)
+    assert cursor["id"] == "instance-1"
+    assert cursor["sync_cursor"] == "tok"
+    [completed] = session.params_for(sync_sources._COMPLETE_STREAM_ACTIVITY)
+    assert completed["id"] == "run-1"
+    assert completed["status"] == "completed"
+    assert completed["records_processed"] == 3
+    assert session.params_for(sync_sources._FAIL_ACTIVITY) == []
+    # One commit for the run INSERT, one for the completion
+    assert session.commits == 2
+
+
+def test_sync_stream_failure_marks_run_failed_and_retries(session, monkeypatch):
+    def run():
+        raise RuntimeError("provider unavailable")
+
+    use_sync(monkeypatch, run)
+    task = FakeTask()
+
+    with pytest.raises(RetryRequested):
+        asyncio.run(sync_sources._sync_stream(task, "stream-1", False))
+
+    assert session.rollbacks == 1
+    [failed] = session.params_for(sync_sources._FAIL_ACTIVITY)
+    assert failed["id"] == "run-1"
+    assert failed["status"] == "failed"
+    assert failed["error_message"] == "RuntimeError: provider unavailable"
+    assert session.params_for(sync_sources._COMPLETE_STREAM_ACTIVITY) == []
+    assert task.retry_countdown == 60
+
+
+def test_sync_stream_non_retryable_failure_is_raised(session, monkeypatch):
+    def run():
+        raise PermissionError("access revoked")
+
+    use_sync(monkeypatch, run)
+    task = FakeTask()
+
+    with pytest.raises(PermissionError):
+        asyncio.run(sync_sources._sync_stream(task, "stream-1", False))
+
+    assert task.retry_countdown is None
+    [failed] = session.params_for(sync_sources._FAIL_ACTIVITY)
+    assert failed["status"] == "failed"
+
+
+@pytest.mark.parametrize("skip_reason", ["device_source", "stream_inactive"])
+def test_sync_stream_skips_ineligible_stream(session, skip_reason):
+    session.stream_row["skip_reason"] = skip_reason
+
+    result = asyncio.run(sync_sources._sync_stream(FakeTask(), "stream-1", False))
+
+    assert result == {"status": "skipped", "reason": skip_reason}
+    assert session.params_for(sync_sources._INSERT_STREAM_ACTIVITY) == []
+
+
+def test_sync_stream_manual_run_ignores_skip_reason(session, monkeypatch):
+    session.stream_row["skip_reason"] = "stream_inactive"
+    use_sync(monkeypatch, lambda: {"records_processed": 0})
+
+    result = asyncio.run(sync_sources._sync_stream(FakeTask(), "stream-1", True))
+
+    assert result["status"] == "success"
+    assert len(session.params_for(sync_sources._INSERT_STREAM_ACTIVITY)) == 1
+
+
+@pytest.mark.parametrize("manual", [False, True])
+def test_sync_stream_missing_stream_raises(session, manual):
+    session.stream_row = None
+
+    with pytest.raises(ValueError, match="Stream stream-1 not found"):
+        asyncio.run(sync_sources._sync_stream(FakeTask(), "stream-1", manual))
+
+
+def test_sync_stream_token_refresher_writes_through_async_session(session, monkeypatch):
+    session.stream_row["auth_type"] = "oauth2"
+
+    async def refresh_func(refresh_token):
+        assert refresh_token == "refresh-1"
+        return {"access_token": "new-access", "expires_in": 600}
+
+    monkeypatch.setattr(
+        token_refresh, "_resolve_refresh_func", lambda source_name: refresh_func
+    )
+
+    class OAuthSync:
+        def __init__(self, stream, access_token, token_refresher=None):
+            self.access_token = access_token
+            self.token_refresher = token_refresher
+
+        async def run(self):
+            # As a client does on a 401
+            self.access_token = await self.token_refresher()
+            return {"records_processed": 1, "access_token": self.access_token}
+
+    monkeypatch.setattr(
+        sync_sources.SourceRegistry,
+        "get_sync_class",
+        staticmethod(lambda stream_name, source_name: OAuthSync),
+    )
+
+    result = asyncio.run(sync_sources._sync_stream(FakeTask(), "stream-1", False))
+
+    assert result["stats"]["access_token"] == "new-access"
+    [update] = session.params_for(token_refresh._UPDATE_SOURCE_TOKENS)
+    assert update["source_id"] == "source-1"
+    assert update["access_token"] == "new-access"
+    assert update["refresh_token"] == "refresh-1"
+    assert update["expires_at"] - update["updated_at"] == timedelta(seconds=600)
+    # Run INSERT, token refresh, completion
+    assert session.commits == 3